@@ -31,10 +31,8 @@ class DocumentAnalyzer:
         try:
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                return text.strip()
+                # Pages are parsed one at a time and joined once, not re-copied per page
+                return "\n".join(page.extract_text() for page in pdf_reader.pages).strip()
         except Exception as e:
             logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
             return ""
@@ -43,10 +41,7 @@ class DocumentAnalyzer:
         """Extract text from Word document"""
         try:
             doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
         except Exception as e:
             logger.error(f"Error extracting text from DOCX {file_path}: {str(e)}")
             return ""
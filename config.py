@@ -4,11 +4,16 @@ Configuration settings for the Square Circle Tender Curation System
 
 import os
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Resolved once so every entry point finds the same database regardless of working directory
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_DATABASE_PATH = BASE_DIR / "tenders.db"
+
 
 @dataclass
 class EvaluationCriteria:
@@ -60,6 +65,8 @@ class ScrapingConfig:
     delay_between_requests: int = 2
     max_retries: int = 3
     timeout: int = 30
+    max_concurrent_sites: int = 4
+    driver_max_pages: int = 50
     user_agents: List[str] = None
 
     def __post_init__(self):
@@ -84,7 +91,10 @@ class Config:
     TENDERS_GOV_PASSWORD = os.getenv("TENDERS_GOV_PASSWORD")
 
     # Database
-    DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///tenders.db")
+    DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DEFAULT_DATABASE_PATH}")
+    BULK_INSERT_CHUNK = int(os.getenv("BULK_INSERT_CHUNK", "500"))
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
 
     REMOTE_DEBUGGING_HOST = os.getenv("REMOTE_DEBUGGING_HOST", "127.0.0.1")
 
@@ -4,11 +4,14 @@ Web interface for managing and reviewing tenders
 """
 import streamlit as st
 import pandas as pd
+import numpy as np
+import re
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import json
 import os
+from sqlalchemy import func, case, text
 from models import Tender, TenderDocument, ScrapingLog, CompanyProfile, SessionLocal, create_tables
 from evaluator import TenderEvaluator
 from scraper import ScrapingManager
@@ -26,8 +29,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize database
-create_tables()
+# Initialize database once per server process; Streamlit re-executes this script on every interaction
+@st.cache_resource
+def init_database():
+    """Create any missing tables"""
+    create_tables()
+
+init_database()
 
 # Custom CSS
 st.markdown("""
@@ -80,6 +88,47 @@ def load_scraping_logs():
     finally:
         db.close()
 
+def load_tender_stats():
+    """Load headline tender metrics and per-source counts in a single grouped query"""
+    db = SessionLocal()
+    try:
+        rows = db.query(
+            Tender.source_site,
+            func.count(Tender.id),
+            func.count(Tender.evaluation_score),
+            func.sum(case((Tender.evaluation_score >= 4.0, 1), else_=0)),
+            func.sum(case((Tender.is_shortlisted == True, 1), else_=0))
+        ).group_by(Tender.source_site).all()
+        return {
+            'total': sum(row[1] for row in rows),
+            'evaluated': sum(row[2] for row in rows),
+            'high_priority': sum(row[3] or 0 for row in rows),
+            'shortlisted': sum(row[4] or 0 for row in rows),
+            'by_source': {row[0]: row[1] for row in rows}
+        }
+    finally:
+        db.close()
+
+def load_evaluation_scores():
+    """Load only the non-zero evaluation scores, for the score histogram"""
+    db = SessionLocal()
+    try:
+        return [score for (score,) in db.query(Tender.evaluation_score).filter(
+            Tender.evaluation_score.isnot(None), Tender.evaluation_score != 0
+        )]
+    finally:
+        db.close()
+
+def load_top_tenders(min_score: float = 4.0, limit: int = 5):
+    """Load the highest-scoring tenders, filtered and ordered in SQL"""
+    db = SessionLocal()
+    try:
+        return db.query(Tender).filter(
+            Tender.evaluation_score >= min_score
+        ).order_by(Tender.evaluation_score.desc()).limit(limit).all()
+    finally:
+        db.close()
+
 def display_tender_card(tender):
     """Display a tender as a card"""
     priority_class = ""
@@ -264,10 +313,10 @@ def show_dashboard():
     """Main dashboard overview"""
     st.header("Dashboard Overview")
     
-    # Load data
-    tenders = load_tender_data()
+    # Aggregates only; this view never needs the full tender rows
+    stats = load_tender_stats()
     
-    if not tenders:
+    if not stats['total']:
         st.warning("No tenders found. Please run the scraper first.")
         if st.button("🔄 Run Quick Scrape"):
             run_scraping()
@@ -277,27 +326,24 @@ def show_dashboard():
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Tenders", len(tenders))
+        st.metric("Total Tenders", stats['total'])
     
     with col2:
-        evaluated_count = sum(1 for t in tenders if t.evaluation_score is not None)
-        st.metric("Evaluated", evaluated_count)
+        st.metric("Evaluated", stats['evaluated'])
     
     with col3:
-        high_priority = sum(1 for t in tenders if t.evaluation_score and t.evaluation_score >= 4.0)
-        st.metric("High Priority", high_priority)
+        st.metric("High Priority", stats['high_priority'])
     
     with col4:
-        shortlisted = sum(1 for t in tenders if t.is_shortlisted)
-        st.metric("Shortlisted", shortlisted)
+        st.metric("Shortlisted", stats['shortlisted'])
     
     # Charts
     col1, col2 = st.columns(2)
     
     with col1:
         # Score distribution
-        if any(t.evaluation_score for t in tenders):
-            scores = [t.evaluation_score for t in tenders if t.evaluation_score]
+        scores = load_evaluation_scores()
+        if scores:
             fig = px.histogram(
                 x=scores, 
                 title="Tender Score Distribution",
@@ -308,9 +354,7 @@ def show_dashboard():
     
     with col2:
         # Source sites
-        source_counts = {}
-        for tender in tenders:
-            source_counts[tender.source_site] = source_counts.get(tender.source_site, 0) + 1
+        source_counts = stats['by_source']
         
         if source_counts:
             fig = px.pie(
@@ -322,10 +366,7 @@ def show_dashboard():
     
     # Recent high-priority tenders
     st.subheader("🔥 Top Priority Tenders")
-    high_priority_tenders = [t for t in tenders if t.evaluation_score and t.evaluation_score >= 4.0]
-    high_priority_tenders.sort(key=lambda x: x.evaluation_score or 0, reverse=True)
-    
-    for tender in high_priority_tenders[:5]:
+    for tender in load_top_tenders():
         display_tender_card(tender)
     
     # Quick actions
@@ -354,6 +395,17 @@ def show_tender_browser():
         st.warning("No tenders available.")
         return
     
+    # Per-tender filter columns, built once and shared by the widgets and the mask
+    meta = pd.DataFrame({
+        'site': [t.source_site for t in tenders],
+        'score': pd.Series([t.evaluation_score for t in tenders], dtype='float64'),
+        'sector': [t.sector or '' for t in tenders],
+        'shortlisted': [bool(t.is_shortlisted) for t in tenders],
+        'deadline': np.array([t.deadline for t in tenders], dtype='datetime64[us]'),
+        'scraped': np.array([t.scraped_at for t in tenders], dtype='datetime64[us]'),
+        'title': [t.title or "" for t in tenders]
+    })
+    
     # Filters
     st.subheader("Filters")
     col1, col2, col3, col4 = st.columns(4)
@@ -362,42 +414,52 @@ def show_tender_browser():
         min_score = st.slider("Minimum Score", 0.0, 5.0, 0.0, 0.1)
     
     with col2:
-        source_sites = list(set(t.source_site for t in tenders))
+        source_sites = meta['site'].dropna().unique().tolist()
         selected_sites = st.multiselect("Source Sites", source_sites, default=source_sites)
     
     with col3:
-        sectors = list(set(t.sector for t in tenders if t.sector))
+        sectors = meta.loc[meta['sector'] != '', 'sector'].unique().tolist()
         selected_sectors = st.multiselect("Sectors", sectors)
     
     with col4:
         show_only_shortlisted = st.checkbox("Show only shortlisted")
     
-    # Apply filters
-    filtered_tenders = tenders
-    
-    if min_score > 0:
-        filtered_tenders = [t for t in filtered_tenders if t.evaluation_score and t.evaluation_score >= min_score]
+    # Apply filters as one combined mask, membership test first
+    mask = np.ones(len(meta), dtype=bool)
     
     if selected_sites:
-        filtered_tenders = [t for t in filtered_tenders if t.source_site in selected_sites]
+        mask &= meta['site'].isin(selected_sites).to_numpy()
+    
+    if min_score > 0:
+        mask &= meta['score'].ge(min_score).to_numpy()
     
     if selected_sectors:
-        filtered_tenders = [t for t in filtered_tenders if t.sector and any(sector in t.sector for sector in selected_sectors)]
+        pattern = '|'.join(re.escape(sector) for sector in selected_sectors)
+        mask &= meta['sector'].str.contains(pattern).to_numpy()
     
     if show_only_shortlisted:
-        filtered_tenders = [t for t in filtered_tenders if t.is_shortlisted]
+        mask &= meta['shortlisted'].to_numpy()
+    
+    filtered_idx = np.flatnonzero(mask)
     
     # Sort options
     sort_by = st.selectbox("Sort by", ["Evaluation Score", "Deadline", "Scraped Date", "Title"])
     
+    # Stable argsorts over int64 epochs/floats; missing dates sort last
+    selected = meta.iloc[filtered_idx]
     if sort_by == "Evaluation Score":
-        filtered_tenders.sort(key=lambda x: x.evaluation_score or 0, reverse=True)
+        sort_keys = -selected['score'].fillna(0).to_numpy()
     elif sort_by == "Deadline":
-        filtered_tenders.sort(key=lambda x: x.deadline or datetime.max)
+        sort_keys = selected['deadline'].to_numpy().astype(np.int64)
+        sort_keys[np.isnat(selected['deadline'].to_numpy())] = np.iinfo(np.int64).max
     elif sort_by == "Scraped Date":
-        filtered_tenders.sort(key=lambda x: x.scraped_at, reverse=True)
-    elif sort_by == "Title":
-        filtered_tenders.sort(key=lambda x: x.title or "")
+        # ~ reverses int64 order without overflow and pushes NaT to the end
+        sort_keys = ~selected['scraped'].to_numpy().astype(np.int64)
+    else:
+        sort_keys = selected['title'].to_numpy()
+    
+    filtered_idx = filtered_idx[np.argsort(sort_keys, kind='stable')]
+    filtered_tenders = [tenders[i] for i in filtered_idx]
     
     # Display results
     st.subheader(f"Results ({len(filtered_tenders)} tenders)")
@@ -546,6 +608,23 @@ def show_system_status():
     """System status and health check"""
     st.header("System Status")
     
+    # One session serves both the connectivity check and the table counts
+    db = SessionLocal()
+    try:
+        # One round trip for all four table counts
+        counts = db.query(
+            db.query(func.count(Tender.id)).scalar_subquery(),
+            db.query(func.count(TenderDocument.id)).scalar_subquery(),
+            db.query(func.count(ScrapingLog.id)).scalar_subquery(),
+            db.query(func.count(CompanyProfile.id)).scalar_subquery()
+        ).one()
+        db_status = "✅ Connected"
+    except:
+        counts = None
+        db_status = "❌ Connection Failed"
+    finally:
+        db.close()
+    
     # API Status
     st.subheader("API Configuration")
     col1, col2 = st.columns(2)
@@ -555,13 +634,6 @@ def show_system_status():
         st.write(f"**OpenAI API:** {openai_status}")
     
     with col2:
-        db_status = "✅ Connected"
-        try:
-            db = SessionLocal()
-            db.execute("SELECT 1")
-            db.close()
-        except:
-            db_status = "❌ Connection Failed"
         st.write(f"**Database:** {db_status}")
     
     # Site credentials
@@ -576,12 +648,8 @@ def show_system_status():
     
     # Database statistics
     st.subheader("Database Statistics")
-    db = SessionLocal()
-    try:
-        tender_count = db.query(Tender).count()
-        document_count = db.query(TenderDocument).count()
-        log_count = db.query(ScrapingLog).count()
-        profile_count = db.query(CompanyProfile).count()
+    if counts:
+        tender_count, document_count, log_count, profile_count = counts
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -592,9 +660,8 @@ def show_system_status():
             st.metric("Scraping Logs", log_count)
         with col4:
             st.metric("Experience Profiles", profile_count)
-    
-    finally:
-        db.close()
+    else:
+        st.error("Database statistics unavailable")
     
     # System health check
     if st.button("🔍 Run Health Check"):
@@ -726,7 +793,7 @@ def run_health_check():
     # Database connectivity
     try:
         db = SessionLocal()
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1")).scalar()
         db.close()
         checks.append(("Database Connection", "✅ OK", ""))
     except Exception as e:
@@ -4,10 +4,12 @@ Scores and ranks tenders based on configurable criteria
 """
 import json
 import logging
+import sys
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from sqlalchemy.orm import Session
-from models import Tender, TenderDocument, CompanyProfile, SessionLocal
+from sqlalchemy.orm import Session, scoped_session
+from models import Tender, TenderDocument, CompanyProfile, ScopedSession, session_scope, bulk_insert_chunks
 from config import Config
 from ai_analyzer import DocumentAnalyzer
 import numpy as np
@@ -16,20 +18,75 @@ import numpy as np
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Deadline bands used by calculate_deadline_scores (mirrors calculate_deadline_score)
+DEADLINE_DAY_BINS = np.array([0, 7, 14, 30, 60])
+DEADLINE_BAND_SCORES = np.array([0.0, 1.0, 2.0, 3.5, 4.5, 5.0])
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+@dataclass(frozen=True)
+class TenderText:
+    """Lower-cased text fields of a tender, computed once per evaluation"""
+    
+    title: str
+    description: str
+    location: str
+    combined: str
+    sectors: Tuple[str, ...]
+    
+    @classmethod
+    def from_tender(cls, tender: Tender) -> 'TenderText':
+        title = (tender.title or '').lower()
+        description = (tender.description or '').lower()
+        
+        # Sectors from tender data and AI analysis
+        sectors = []
+        if tender.sector:
+            sectors.extend(tender.sector.lower().split(', '))
+        if tender.ai_extracted_sectors:
+            try:
+                sectors.extend(s.lower() for s in json.loads(tender.ai_extracted_sectors))
+            except json.JSONDecodeError:
+                pass
+        
+        return cls(
+            title=title,
+            description=description,
+            location=(tender.location or '').lower(),
+            combined=f"{title} {description}",
+            sectors=tuple(sectors)
+        )
+
 class TenderEvaluator:
     """Evaluates and scores tenders based on Square Circle's criteria"""
     
-    def __init__(self):
+    def __init__(self, session_registry: scoped_session = ScopedSession):
         """Initialize the tender evaluator"""
-        self.db = SessionLocal()
+        self.session_registry = session_registry
         self.ai_analyzer = DocumentAnalyzer()
         self.config = Config.evaluation
     
-    def evaluate_tender(self, tender: Tender) -> Dict:
+    @property
+    def db(self) -> Session:
+        """Session owned by the calling thread"""
+        return self.session_registry()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def evaluate_tender(self, tender: Tender, now: Optional[datetime] = None,
+                        deadline_score: Optional[float] = None) -> Dict:
         """
         Evaluate a single tender and return detailed scoring
         """
+        now = now or datetime.utcnow()
         try:
+            # Tenders loaded by another session must be attached before scores are written
+            if tender not in self.db:
+                tender = self.db.merge(tender)
+            
             logger.info(f"Evaluating tender: {tender.title}")
             
             # Initialize scores
@@ -43,12 +100,18 @@ class TenderEvaluator:
                 'overall_score': 0.0
             }
             
+            # Lower-case the text fields once and share them across the scorers
+            text = TenderText.from_tender(tender)
+            
             # Calculate individual scores
-            scores['sector_score'] = self.calculate_sector_score(tender)
-            scores['location_score'] = self.calculate_location_score(tender)
+            scores['sector_score'] = self.calculate_sector_score(tender, text)
+            scores['location_score'] = self.calculate_location_score(tender, text)
             scores['budget_score'] = self.calculate_budget_score(tender)
-            scores['deadline_score'] = self.calculate_deadline_score(tender)
-            scores['experience_score'] = self.calculate_experience_score(tender)
+            scores['deadline_score'] = (
+                deadline_score if deadline_score is not None
+                else self.calculate_deadline_score(tender, now)
+            )
+            scores['experience_score'] = self.calculate_experience_score(tender, text)
             scores['ai_score'] = self.calculate_ai_score(tender)
             
             # Calculate weighted overall score
@@ -75,13 +138,13 @@ class TenderEvaluator:
             self.db.commit()
             
             # Generate recommendation
-            recommendation = self.generate_recommendation(scores, tender)
+            recommendation = self.generate_recommendation(scores, tender, now)
             
             return {
                 'tender_id': tender.id,
                 'scores': scores,
                 'recommendation': recommendation,
-                'evaluation_date': datetime.utcnow().isoformat()
+                'evaluation_date': now.isoformat()
             }
             
         except Exception as e:
@@ -93,27 +156,17 @@ class TenderEvaluator:
                 'scores': scores
             }
     
-    def calculate_sector_score(self, tender: Tender) -> float:
+    def calculate_sector_score(self, tender: Tender, text: Optional[TenderText] = None) -> float:
         """Calculate score based on sector relevance"""
         try:
-            sectors_to_check = []
+            text = text or TenderText.from_tender(tender)
             
-            # Add sectors from tender data
-            if tender.sector:
-                sectors_to_check.extend(tender.sector.lower().split(', '))
-            
-            # Add sectors from AI analysis
-            if tender.ai_extracted_sectors:
-                try:
-                    ai_sectors = json.loads(tender.ai_extracted_sectors)
-                    sectors_to_check.extend([s.lower() for s in ai_sectors])
-                except json.JSONDecodeError:
-                    pass
+            # Sectors from tender data and AI analysis
+            sectors_to_check = list(text.sectors)
             
             # Check title and description for sector keywords
-            text_to_analyze = f"{tender.title or ''} {tender.description or ''}".lower()
             for priority_sector in self.config.priority_sectors.keys():
-                if priority_sector in text_to_analyze:
+                if priority_sector in text.combined:
                     sectors_to_check.append(priority_sector)
             
             if not sectors_to_check:
@@ -132,10 +185,11 @@ class TenderEvaluator:
             logger.error(f"Error calculating sector score: {str(e)}")
             return 2.0
     
-    def calculate_location_score(self, tender: Tender) -> float:
+    def calculate_location_score(self, tender: Tender, text: Optional[TenderText] = None) -> float:
         """Calculate score based on geographic location"""
         try:
-            location_text = (tender.location or '').lower()
+            text = text or TenderText.from_tender(tender)
+            location_text = text.location
             
             if not location_text:
                 return 2.5  # Neutral score if no location specified
@@ -146,8 +200,7 @@ class TenderEvaluator:
                     return min(weight, 5.0)
             
             # Check for specific countries/regions in description
-            description_text = (tender.description or '').lower()
-            combined_text = f"{location_text} {description_text}"
+            combined_text = f"{location_text} {text.description}"
             
             for region, weight in self.config.geographic_preferences.items():
                 if region in combined_text:
@@ -192,13 +245,13 @@ class TenderEvaluator:
             logger.error(f"Error calculating budget score: {str(e)}")
             return 2.0
     
-    def calculate_deadline_score(self, tender: Tender) -> float:
+    def calculate_deadline_score(self, tender: Tender, now: Optional[datetime] = None) -> float:
         """Calculate score based on deadline feasibility"""
         try:
             if not tender.deadline:
                 return 2.5  # Neutral score if no deadline specified
             
-            days_until_deadline = (tender.deadline - datetime.utcnow()).days
+            days_until_deadline = (tender.deadline - (now or datetime.utcnow())).days
             
             if days_until_deadline < 0:
                 return 0.0  # Deadline passed
@@ -217,28 +270,33 @@ class TenderEvaluator:
             logger.error(f"Error calculating deadline score: {str(e)}")
             return 2.0
     
-    def calculate_experience_score(self, tender: Tender) -> float:
+    def calculate_deadline_scores(self, tenders: List[Tender], now: datetime) -> np.ndarray:
+        """Calculate deadline scores for a batch of tenders in one vectorized pass"""
+        # Deadlines as int64 microseconds since epoch, missing deadlines flagged separately
+        deadlines = np.array([t.deadline for t in tenders], dtype='datetime64[us]')
+        missing = np.isnat(deadlines)
+        
+        now_us = np.datetime64(now, 'us').astype(np.int64)
+        days = (deadlines.astype(np.int64) - now_us) // MICROSECONDS_PER_DAY
+        
+        scores = DEADLINE_BAND_SCORES[np.digitize(days, DEADLINE_DAY_BINS)]
+        scores[missing] = 2.5  # Neutral score if no deadline specified
+        return scores
+    
+    def calculate_experience_score(self, tender: Tender, text: Optional[TenderText] = None) -> float:
         """Calculate score based on Square Circle's relevant experience"""
         try:
             # Get sectors and location from tender
-            sectors = []
-            if tender.sector:
-                sectors.extend(tender.sector.lower().split(', '))
-            if tender.ai_extracted_sectors:
-                try:
-                    ai_sectors = json.loads(tender.ai_extracted_sectors)
-                    sectors.extend([s.lower() for s in ai_sectors])
-                except json.JSONDecodeError:
-                    pass
-            
-            location = (tender.location or '').lower()
+            text = text or TenderText.from_tender(tender)
+            sectors = text.sectors
+            location = text.location
             
             # Query company experience
             experience_profiles = self.db.query(CompanyProfile).all()
             
             if not experience_profiles:
                 # Default experience scoring based on tender content
-                return self.default_experience_scoring(tender)
+                return self.default_experience_scoring(tender, text)
             
             max_experience_score = 0.0
             
@@ -267,12 +325,12 @@ class TenderEvaluator:
             logger.error(f"Error calculating experience score: {str(e)}")
             return 2.0
     
-    def default_experience_scoring(self, tender: Tender) -> float:
+    def default_experience_scoring(self, tender: Tender, text: Optional[TenderText] = None) -> float:
         """Default experience scoring when no company profiles exist"""
         score = 3.0  # Base score
         
         # Sector-based adjustments
-        content = f"{tender.title or ''} {tender.description or ''}".lower()
+        content = (text or TenderText.from_tender(tender)).combined
         
         # Higher score for consulting/advisory work
         consulting_keywords = ['consulting', 'advisory', 'technical assistance', 'capacity building']
@@ -352,9 +410,10 @@ class TenderEvaluator:
         except Exception as e:
             logger.error(f"Error analyzing document {document.filename}: {str(e)}")
     
-    def generate_recommendation(self, scores: Dict, tender: Tender) -> Dict:
+    def generate_recommendation(self, scores: Dict, tender: Tender, now: Optional[datetime] = None) -> Dict:
         """Generate recommendation based on scores"""
         overall_score = scores['overall_score']
+        now = now or datetime.utcnow()
         
         if overall_score >= 4.0:
             priority = "High"
@@ -395,24 +454,29 @@ class TenderEvaluator:
             'overall_score': overall_score,
             'strengths': strengths,
             'concerns': concerns,
-            'deadline_days': (tender.deadline - datetime.utcnow()).days if tender.deadline else None
+            'deadline_days': (tender.deadline - now).days if tender.deadline else None
         }
     
     def evaluate_all_tenders(self, limit: Optional[int] = None) -> List[Dict]:
         """Evaluate all tenders in the database"""
         try:
-            query = self.db.query(Tender)
-            if limit:
-                query = query.limit(limit)
-            
-            tenders = query.all()
-            results = []
-            
-            for tender in tenders:
-                result = self.evaluate_tender(tender)
-                results.append(result)
-            
-            return results
+            with session_scope(self.session_registry) as db:
+                query = db.query(Tender)
+                if limit:
+                    query = query.limit(limit)
+                
+                tenders = query.all()
+                results = []
+                
+                # One clock read for the whole batch
+                now = datetime.utcnow()
+                deadline_scores = self.calculate_deadline_scores(tenders, now)
+                
+                for tender, deadline_score in zip(tenders, deadline_scores.tolist()):
+                    result = self.evaluate_tender(tender, now, deadline_score)
+                    results.append(result)
+                
+                return results
             
         except Exception as e:
             logger.error(f"Error evaluating all tenders: {str(e)}")
@@ -421,10 +485,11 @@ class TenderEvaluator:
     def get_shortlisted_tenders(self, min_score: float = 3.0) -> List[Tender]:
         """Get tenders that meet the minimum score threshold"""
         try:
-            return self.db.query(Tender)\
-                .filter(Tender.evaluation_score >= min_score)\
-                .order_by(Tender.evaluation_score.desc())\
-                .all()
+            with session_scope(self.session_registry) as db:
+                return db.query(Tender)\
+                    .filter(Tender.evaluation_score >= min_score)\
+                    .order_by(Tender.evaluation_score.desc())\
+                    .all()
         except Exception as e:
             logger.error(f"Error getting shortlisted tenders: {str(e)}")
             return []
@@ -433,63 +498,104 @@ class TenderEvaluator:
                              experience_level: float = 3.0, success_rate: float = 0.8):
         """Add or update company experience profile"""
         try:
-            existing_profile = self.db.query(CompanyProfile)\
-                .filter_by(sector=sector, country=country)\
-                .first()
-            
-            if existing_profile:
-                existing_profile.experience_level = experience_level
-                existing_profile.success_rate = success_rate
-                existing_profile.similar_projects += 1
-            else:
-                new_profile = CompanyProfile(
-                    sector=sector,
-                    country=country,
-                    experience_level=experience_level,
-                    success_rate=success_rate,
-                    similar_projects=1
-                )
-                self.db.add(new_profile)
-            
-            self.db.commit()
+            with session_scope(self.session_registry) as db:
+                existing_profile = db.query(CompanyProfile)\
+                    .filter_by(sector=sector, country=country)\
+                    .first()
+                
+                if existing_profile:
+                    existing_profile.experience_level = experience_level
+                    existing_profile.success_rate = success_rate
+                    existing_profile.similar_projects += 1
+                else:
+                    new_profile = CompanyProfile(
+                        sector=sector,
+                        country=country,
+                        experience_level=experience_level,
+                        success_rate=success_rate,
+                        similar_projects=1
+                    )
+                    db.add(new_profile)
+                
+                db.commit()
             logger.info(f"Updated company profile for {sector} in {country or 'global'}")
             
         except Exception as e:
             logger.error(f"Error updating company profile: {str(e)}")
-            self.db.rollback()
+    
+    def update_company_profiles(self, profiles: List[Dict]):
+        """Add or update several company experience profiles in one transaction"""
+        try:
+            with session_scope(self.session_registry) as db:
+                sectors = {profile['sector'] for profile in profiles}
+                existing = {}
+                for profile in db.query(CompanyProfile).filter(CompanyProfile.sector.in_(sectors)).order_by(CompanyProfile.id):
+                    existing.setdefault((profile.sector, profile.country), profile)
+                
+                now = datetime.utcnow()
+                updates = {}
+                inserts = {}
+                for profile in profiles:
+                    key = (profile['sector'], profile.get('country'))
+                    levels = {
+                        'experience_level': profile.get('experience_level', 3.0),
+                        'success_rate': profile.get('success_rate', 0.8)
+                    }
+                    if key in existing:
+                        row = existing[key]
+                        pending = updates.setdefault(row.id, {'id': row.id, 'similar_projects': row.similar_projects or 0})
+                        pending.update(levels, similar_projects=pending['similar_projects'] + 1)
+                    elif key in inserts:
+                        # Repeated within the batch: same as updating the row just added
+                        inserts[key].update(levels, similar_projects=inserts[key]['similar_projects'] + 1)
+                    else:
+                        inserts[key] = {'sector': key[0], 'country': key[1], 'similar_projects': 1, 'created_at': now, **levels}
+                
+                db.bulk_update_mappings(CompanyProfile, list(updates.values()))
+                bulk_insert_chunks(db, CompanyProfile, list(inserts.values()))
+                db.commit()
+            logger.info(f"Updated {len(profiles)} company profiles")
+            
+        except Exception as e:
+            logger.error(f"Error updating company profiles: {str(e)}")
     
     def close(self):
-        """Close database connection"""
-        self.db.close()
+        """Release this thread's database session back to the pool"""
+        self.session_registry.remove()
 
 # Example usage and testing
 if __name__ == "__main__":
     evaluator = TenderEvaluator()
     
     # Add some sample company profiles
-    evaluator.update_company_profile("climate change", "fiji", 4.2, 0.85)
-    evaluator.update_company_profile("governance", "vanuatu", 3.8, 0.75)
-    evaluator.update_company_profile("infrastructure", "pacific", 3.5, 0.80)
+    evaluator.update_company_profiles([
+        {'sector': "climate change", 'country': "fiji", 'experience_level': 4.2, 'success_rate': 0.85},
+        {'sector': "governance", 'country': "vanuatu", 'experience_level': 3.8, 'success_rate': 0.75},
+        {'sector': "infrastructure", 'country': "pacific", 'experience_level': 3.5, 'success_rate': 0.80}
+    ])
     
     # Evaluate all tenders
     results = evaluator.evaluate_all_tenders(limit=5)
     
-    print("Tender Evaluation Results:")
-    print("=" * 50)
+    # Collect the report and write it in one go rather than one print per line
+    out = ["Tender Evaluation Results:", "=" * 50]
     
     for result in results:
         if 'error' not in result:
-            print(f"Tender ID: {result['tender_id']}")
-            print(f"Overall Score: {result['scores']['overall_score']}/5.0")
-            print(f"Priority: {result['recommendation']['priority']}")
-            print(f"Action: {result['recommendation']['action_recommendation']}")
+            recommendation = result['recommendation']
+            out.append(f"Tender ID: {result['tender_id']}")
+            out.append(f"Overall Score: {result['scores']['overall_score']}/5.0")
+            out.append(f"Priority: {recommendation['priority']}")
+            out.append(f"Action: {recommendation['action_recommendation']}")
             
-            if result['recommendation']['strengths']:
-                print(f"Strengths: {', '.join(result['recommendation']['strengths'])}")
+            if recommendation['strengths']:
+                out.append(f"Strengths: {', '.join(recommendation['strengths'])}")
             
-            if result['recommendation']['concerns']:
-                print(f"Concerns: {', '.join(result['recommendation']['concerns'])}")
+            if recommendation['concerns']:
+                out.append(f"Concerns: {', '.join(recommendation['concerns'])}")
             
-            print("-" * 30)
+            out.append("-" * 30)
+    
+    sys.stdout.write('\n'.join(out) + '\n')
     
     evaluator.close()
@@ -3,13 +3,42 @@ Export Module for Square Circle Tender System
 Handles CSV, Excel, and PDF exports of tender data
 """
 import pandas as pd
+import numpy as np
 import io
 import json
-from datetime import datetime
-from typing import List, Dict
+from collections import Counter
+from importlib.util import find_spec
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
 from models import Tender, SessionLocal
 import streamlit as st
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+PRIORITY_BINS = np.array([2.0, 3.0, 4.0])
+# Indexed by np.digitize(score, PRIORITY_BINS)
+PRIORITY_LABELS = np.array(['Very Low Priority', 'Low Priority', 'Medium Priority', 'High Priority'], dtype=object)
+
+# Probe for xlsxwriter without importing it; pandas loads the engine when a workbook is written
+if find_spec('xlsxwriter'):
+    EXCEL_ENGINE = 'xlsxwriter'
+    EXCEL_WRITER_KWARGS = {'options': {'strings_to_urls': False, 'strings_to_formulas': False}}
+else:
+    EXCEL_ENGINE = 'openpyxl'
+    EXCEL_WRITER_KWARGS = {}
+
+# Columns read by the exporters; rows are fetched as Core Row tuples instead of ORM instances
+EXPORT_COLUMNS = (
+    Tender.id, Tender.title, Tender.source_site, Tender.url, Tender.deadline,
+    Tender.location, Tender.sector, Tender.budget_min, Tender.budget_max, Tender.budget_currency,
+    Tender.description, Tender.scraped_at, Tender.last_updated, Tender.evaluation_score
+)
+
 class TenderExporter:
     """Export tender data in various formats"""
     
@@ -19,35 +48,92 @@ class TenderExporter:
     
     def prepare_tender_data(self, tenders: List[Tender], include_scores: bool = True) -> pd.DataFrame:
         """Convert tender data to pandas DataFrame for export"""
-        data = []
-        
-        for tender in tenders:
-            row = {
-                'ID': tender.id,
-                'Title': tender.title or 'Untitled',
-                'Source': tender.source_site,
-                'URL': tender.url,
-                'Deadline': tender.deadline.strftime('%Y-%m-%d') if tender.deadline else '',
-                'Location': tender.location or '',
-                'Sector': tender.sector or '',
-                'Budget_Min': tender.budget_min or '',
-                'Budget_Max': tender.budget_max or '',
-                'Budget_Currency': tender.budget_currency or '',
-                'Description': (tender.description or '')[:500],  # Truncate for export
-                'Scraped_Date': tender.scraped_at.strftime('%Y-%m-%d %H:%M') if tender.scraped_at else '',
-                'Last_Updated': tender.last_updated.strftime('%Y-%m-%d %H:%M') if tender.last_updated else ''
-            }
-            
-            if include_scores and tender.evaluation_score:
-                row.update({
-                    'Evaluation_Score': round(tender.evaluation_score, 2),
-                    'Priority': self.get_priority_label(tender.evaluation_score),
-                    'Evaluation_Reasons': tender.evaluation_reasons or ''
-                })
-            
-            data.append(row)
+        if include_scores:
+            return self._build_with_scores(tenders)
+        return self._build_basic(tenders)
+    
+    def _build_basic(self, tenders: List[Tender]) -> pd.DataFrame:
+        """Build the export columns shared by every format"""
+        n = len(tenders)
+        
+        # One list per column, filled in a single pass over the tenders
+        ids = [None] * n
+        titles = [None] * n
+        sources = [None] * n
+        urls = [None] * n
+        deadlines = [None] * n
+        locations = [None] * n
+        sectors = [None] * n
+        budget_mins = [None] * n
+        budget_maxs = [None] * n
+        currencies = [None] * n
+        descriptions = [None] * n
+        scraped = [None] * n
+        updated = [None] * n
         
-        return pd.DataFrame(data)
+        for i, tender in enumerate(tenders):
+            ids[i] = tender.id
+            titles[i] = tender.title
+            sources[i] = tender.source_site
+            urls[i] = tender.url
+            deadlines[i] = tender.deadline
+            locations[i] = tender.location
+            sectors[i] = tender.sector
+            budget_mins[i] = tender.budget_min or ''
+            budget_maxs[i] = tender.budget_max or ''
+            currencies[i] = tender.budget_currency
+            descriptions[i] = tender.description
+            scraped[i] = tender.scraped_at
+            updated[i] = tender.last_updated
+        
+        return pd.DataFrame({
+            'ID': ids,
+            'Title': self.text_column(titles, 'Untitled'),
+            'Source': sources,
+            'URL': urls,
+            'Deadline': self.format_dates(deadlines, '%Y-%m-%d'),
+            'Location': self.text_column(locations),
+            'Sector': self.text_column(sectors),
+            'Budget_Min': budget_mins,
+            'Budget_Max': budget_maxs,
+            'Budget_Currency': self.text_column(currencies),
+            'Description': pd.Series(descriptions, dtype=object).fillna('').str.slice(0, 500),  # Truncate for export
+            'Scraped_Date': self.format_dates(scraped, '%Y-%m-%d %H:%M'),
+            'Last_Updated': self.format_dates(updated, '%Y-%m-%d %H:%M')
+        })
+    
+    def _build_with_scores(self, tenders: List[Tender]) -> pd.DataFrame:
+        """Build the export columns plus score, priority and reasons for evaluated tenders"""
+        df = self._build_basic(tenders)
+        
+        score_arr = np.array([tender.evaluation_score or np.nan for tender in tenders], dtype=np.float64)
+        scored = ~np.isnan(score_arr)
+        
+        if scored.any():
+            reasons = np.array([getattr(tender, 'evaluation_reasons', None) or '' for tender in tenders], dtype=object)
+            # One bucketing pass instead of a comparison per priority band
+            priorities = PRIORITY_LABELS[np.digitize(score_arr, PRIORITY_BINS)]
+            df['Evaluation_Score'] = np.round(score_arr, 2)
+            df['Priority'] = np.where(scored, priorities, None)
+            df['Evaluation_Reasons'] = np.where(scored, reasons, None)
+        
+        return df
+    
+    @staticmethod
+    def text_column(values: List[Optional[str]], default: str = '') -> pd.Series:
+        """Text column with blank or missing entries replaced by a default in one pass"""
+        column = pd.Series(values, dtype=object)
+        return column.where(column.astype(bool), default)
+    
+    @staticmethod
+    def format_dates(values: List[datetime], fmt: str) -> pd.Series:
+        """Format a column of datetimes in one vectorized pass, blank where missing"""
+        return pd.Series(pd.to_datetime(values), dtype='datetime64[ns]').dt.strftime(fmt).fillna('')
+    
+    @staticmethod
+    def format_optional_dates(values: List[datetime], fmt: str) -> List[Optional[str]]:
+        """Format a column of datetimes in one vectorized pass, None where missing"""
+        return [value or None for value in TenderExporter.format_dates(values, fmt).tolist()]
     
     def get_priority_label(self, score: float) -> str:
         """Get priority label based on score"""
@@ -60,9 +146,13 @@ class TenderExporter:
         else:
             return "Very Low Priority"
     
-    def export_to_csv(self, tenders: List[Tender], filename: str = None) -> io.StringIO:
+    def export_to_csv(self, tenders: List[Tender], filename: str = None, df: pd.DataFrame = None) -> io.StringIO:
         """Export tenders to CSV format"""
-        df = self.prepare_tender_data(tenders)
+        if not tenders:
+            return io.StringIO()
+        
+        if df is None:
+            df = self.prepare_tender_data(tenders)
         
         # Create CSV in memory
         csv_buffer = io.StringIO()
@@ -71,36 +161,52 @@ class TenderExporter:
         
         return csv_buffer
     
-    def export_to_excel(self, tenders: List[Tender], filename: str = None) -> io.BytesIO:
+    def export_to_excel(self, tenders: List[Tender], filename: str = None, df: pd.DataFrame = None) -> io.BytesIO:
         """Export tenders to Excel format with multiple sheets"""
-        df = self.prepare_tender_data(tenders)
+        if not tenders:
+            return io.BytesIO()
+        
+        if df is None:
+            df = self.prepare_tender_data(tenders)
         
         # Create Excel file in memory
         excel_buffer = io.BytesIO()
         
-        with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
+        # Work out every sheet's rows up front so each sheet is written from a ready view
+        has_scores = 'Evaluation_Score' in df.columns
+        high_priority = df[df['Evaluation_Score'].to_numpy() >= 3.0] if has_scores else df.iloc[:0]
+        
+        summary_aggs = {'Count': ('ID', 'count')}
+        if has_scores:
+            summary_aggs.update(
+                Avg_Score=('Evaluation_Score', 'mean'),
+                Max_Score=('Evaluation_Score', 'max'),
+                Min_Score=('Evaluation_Score', 'min')
+            )
+        
+        # Deadlines are parsed once; the timeline is ordered by an argsort over the dated rows
+        deadline_dt = pd.to_datetime(df['Deadline'], errors='coerce').to_numpy()
+        dated_idx = np.flatnonzero(df['Deadline'].to_numpy() != '')
+        dated_idx = dated_idx[np.argsort(deadline_dt[dated_idx], kind='stable')]
+        
+        # xlsxwriter serializes much faster than openpyxl; skip per-cell URL/formula detection.
+        # constant_memory is left off: pandas writes column by column, which that mode drops.
+        with pd.ExcelWriter(excel_buffer, engine=EXCEL_ENGINE, engine_kwargs=EXCEL_WRITER_KWARGS) as writer:
             # Main data sheet
             df.to_excel(writer, sheet_name='All_Tenders', index=False)
             
             # High priority tenders
-            high_priority = df[df['Evaluation_Score'] >= 3.0] if 'Evaluation_Score' in df.columns else pd.DataFrame()
             if not high_priority.empty:
                 high_priority.to_excel(writer, sheet_name='Recommended_Tenders', index=False)
             
             # Summary by source
             if not df.empty:
-                summary = df.groupby('Source').agg({
-                    'ID': 'count',
-                    'Evaluation_Score': ['mean', 'max', 'min'] if 'Evaluation_Score' in df.columns else 'count'
-                }).round(2)
-                summary.columns = ['Count', 'Avg_Score', 'Max_Score', 'Min_Score'] if 'Evaluation_Score' in df.columns else ['Count']
+                summary = df.groupby('Source', sort=False).agg(**summary_aggs).round(2)
                 summary.to_excel(writer, sheet_name='Summary_by_Source')
             
             # Timeline if deadlines exist
-            timeline_data = df[df['Deadline'] != ''].copy() if not df.empty else pd.DataFrame()
-            if not timeline_data.empty:
-                timeline_data['Deadline'] = pd.to_datetime(timeline_data['Deadline'])
-                timeline_data = timeline_data.sort_values('Deadline')
+            if dated_idx.size:
+                timeline_data = df.iloc[dated_idx].assign(Deadline=deadline_dt[dated_idx])
                 timeline_data.to_excel(writer, sheet_name='Timeline', index=False)
         
         excel_buffer.seek(0)
@@ -111,45 +217,61 @@ class TenderExporter:
         if not tenders:
             return {"error": "No tenders to analyze"}
         
-        df = self.prepare_tender_data(tenders)
+        # Extract the fields the report needs in a single pass
+        n = len(tenders)
+        scores = np.empty(n, dtype=np.float64)
+        sources = np.empty(n, dtype=object)
+        scraped = [None] * n
+        deadlines = [None] * n
+        for i, t in enumerate(tenders):
+            scores[i] = np.nan if t.evaluation_score is None else t.evaluation_score
+            sources[i] = t.source_site
+            scraped[i] = t.scraped_at
+            deadlines[i] = t.deadline
+        
+        scraped_us = np.array(scraped, dtype='datetime64[us]').astype(np.int64)
+        deadline_us = np.array(deadlines, dtype='datetime64[us]')
         
         # Basic stats
-        total_tenders = len(tenders)
-        evaluated_tenders = sum(1 for t in tenders if t.evaluation_score is not None)
-        
-        # Score distribution
-        score_dist = {
-            "high_priority": sum(1 for t in tenders if t.evaluation_score and t.evaluation_score >= 4.0),
-            "medium_priority": sum(1 for t in tenders if t.evaluation_score and 3.0 <= t.evaluation_score < 4.0),
-            "low_priority": sum(1 for t in tenders if t.evaluation_score and 2.0 <= t.evaluation_score < 3.0),
-            "very_low_priority": sum(1 for t in tenders if t.evaluation_score and t.evaluation_score < 2.0)
-        }
+        total_tenders = n
+        evaluated_tenders = int(np.count_nonzero(~np.isnan(scores)))
+        
+        # Score distribution (a score of 0 counts as unrated, as before)
+        rated_idx = np.flatnonzero(~np.isnan(scores) & (scores != 0))
+        rated = scores[rated_idx]
+        if rated_idx.size:
+            # One bucketing pass: <2, [2, 3), [3, 4), >=4
+            buckets = np.bincount(np.digitize(rated, PRIORITY_BINS), minlength=4)
+            score_dist = {
+                "high_priority": int(buckets[3]),
+                "medium_priority": int(buckets[2]),
+                "low_priority": int(buckets[1]),
+                "very_low_priority": int(buckets[0])
+            }
+            
+            # Top scoring tenders
+            top_tenders = [tenders[i] for i in rated_idx[self.top_k_indices(-rated, 10)]]
+        else:
+            # Nothing rated yet: skip the distribution and ranking work
+            score_dist = dict.fromkeys(("high_priority", "medium_priority", "low_priority", "very_low_priority"), 0)
+            top_tenders = []
         
         # Source breakdown
-        source_stats = df.groupby('Source').agg({
-            'ID': 'count',
-            'Evaluation_Score': 'mean' if 'Evaluation_Score' in df.columns else 'count'
-        }).round(2).to_dict()
-        
-        # Top scoring tenders
-        top_tenders = sorted(
-            [t for t in tenders if t.evaluation_score],
-            key=lambda x: x.evaluation_score,
-            reverse=True
-        )[:10]
-        
-        # Recent activity
-        recent_tenders = sorted(
-            tenders,
-            key=lambda x: x.scraped_at or datetime.min,
-            reverse=True
-        )[:5]
+        source_stats = self.source_statistics(sources, rated_idx, np.round(rated, 2))
+        
+        # Recent activity (~ reverses int64 order without overflow; missing dates sort last)
+        recent_tenders = [tenders[i] for i in self.top_k_indices(~scraped_us, 5)]
         
         # Upcoming deadlines
-        upcoming_deadlines = sorted(
-            [t for t in tenders if t.deadline and t.deadline > datetime.now()],
-            key=lambda x: x.deadline
-        )[:10]
+        future_idx = np.flatnonzero(deadline_us > np.datetime64(datetime.now(), 'us'))
+        upcoming_deadlines = [
+            tenders[i] for i in future_idx[self.top_k_indices(deadline_us[future_idx].astype(np.int64), 10)]
+        ]
+        
+        # Format the report's dates per column rather than per row
+        top_deadlines = self.format_optional_dates([t.deadline for t in top_tenders], '%Y-%m-%d')
+        recent_scraped = self.format_optional_dates([t.scraped_at for t in recent_tenders], '%Y-%m-%d')
+        upcoming_dates = self.format_optional_dates([t.deadline for t in upcoming_deadlines], '%Y-%m-%d')
         
         return {
             "summary": {
@@ -164,34 +286,152 @@ class TenderExporter:
                     "title": t.title,
                     "score": round(t.evaluation_score, 2),
                     "source": t.source_site,
-                    "deadline": t.deadline.strftime('%Y-%m-%d') if t.deadline else None
+                    "deadline": deadline
                 }
-                for t in top_tenders
+                for t, deadline in zip(top_tenders, top_deadlines)
             ],
             "recent_activity": [
                 {
                     "title": t.title,
                     "source": t.source_site,
-                    "scraped": t.scraped_at.strftime('%Y-%m-%d') if t.scraped_at else None
+                    "scraped": scraped
                 }
-                for t in recent_tenders
+                for t, scraped in zip(recent_tenders, recent_scraped)
             ],
             "upcoming_deadlines": [
                 {
                     "title": t.title,
-                    "deadline": t.deadline.strftime('%Y-%m-%d') if t.deadline else None,
+                    "deadline": deadline,
                     "score": round(t.evaluation_score, 2) if t.evaluation_score else None,
                     "source": t.source_site
                 }
-                for t in upcoming_deadlines
+                for t, deadline in zip(upcoming_deadlines, upcoming_dates)
             ]
         }
+    
+    @staticmethod
+    def top_k_indices(keys: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k smallest keys in ascending order, ties kept in input order"""
+        if keys.size > k:
+            # Partition to the k-th smallest key, then sort only the candidates
+            kth = np.partition(keys, k - 1)[k - 1]
+            candidates = np.flatnonzero(keys <= kth)
+        else:
+            candidates = np.arange(keys.size)
+        return candidates[np.argsort(keys[candidates], kind='stable')][:k]
+    
+    @staticmethod
+    def source_statistics(sources: np.ndarray, rated_idx: np.ndarray, rated_scores: np.ndarray) -> Dict:
+        """Per-source tender counts and mean score"""
+        # Only a handful of distinct sources: plain counters beat factorizing the column
+        counts = Counter(source for source in sources.tolist() if source is not None)
+        names = sorted(counts)
+        stats = {'ID': {name: counts[name] for name in names}}
+        
+        if rated_idx.size and names:
+            sums, rated_counts = Counter(), Counter()
+            for source, score in zip(sources[rated_idx].tolist(), rated_scores.tolist()):
+                if source is not None:
+                    sums[source] += score
+                    rated_counts[source] += 1
+            stats['Evaluation_Score'] = {
+                name: float(np.round(sums[name] / rated_counts[name], 2)) if rated_counts[name] else np.nan
+                for name in names
+            }
+        
+        return stats
+
+def normalize_report_value(value):
+    """Convert NumPy values to Python ones, NaN/inf to None and dates to str, so orjson and json write the same report"""
+    if isinstance(value, dict):
+        return {normalize_report_value(key): normalize_report_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalize_report_value(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    if isinstance(value, date):
+        # orjson writes ISO 8601 with a 'T'; keep json's default=str form
+        return str(value)
+    return value
+
+def report_to_json(report: Dict) -> str:
+    """Serialize a summary report as indented JSON, using orjson when it is installed"""
+    report = normalize_report_value(report)
+    if orjson is not None:
+        return orjson.dumps(report, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(report, indent=2, default=str)
+
+def tender_list_key(tenders: List[Tender]) -> tuple:
+    """Cache key for a tender list: identity plus the fields that change after scraping"""
+    return tuple((t.id, t.last_updated, t.evaluation_score) for t in tenders)
+
+@st.cache_data(hash_funcs={list: tender_list_key})
+def prepare_tender_frame(tenders: List[Tender], include_scores: bool = True) -> pd.DataFrame:
+    """Build the export DataFrame once per filtered tender set"""
+    return TenderExporter().prepare_tender_data(tenders, include_scores)
 
-def get_all_tenders():
+def get_all_tenders() -> List[Row]:
     """Get all tenders from database"""
     db = SessionLocal()
     try:
-        return db.query(Tender).all()
+        return db.execute(select(*EXPORT_COLUMNS)).all()
+    finally:
+        db.close()
+
+def get_filter_metadata() -> Dict:
+    """Get tender count, source sites, deadline range and data version for the export filters"""
+    db = SessionLocal()
+    try:
+        total, max_id, last_updated, min_deadline, max_deadline = db.query(
+            func.count(Tender.id), func.max(Tender.id), func.max(Tender.last_updated),
+            func.min(Tender.deadline), func.max(Tender.deadline)
+        ).one()
+        sources = [
+            source for (source,) in db.query(Tender.source_site)
+            .filter(Tender.source_site.isnot(None))
+            .distinct()
+            .order_by(Tender.source_site)
+        ]
+        return {
+            'total': total,
+            'sources': sources,
+            'min_deadline': min_deadline,
+            'max_deadline': max_deadline,
+            # Changes whenever a tender is added, removed, re-scraped or re-evaluated
+            'version': (total, max_id, last_updated)
+        }
+    finally:
+        db.close()
+
+@st.cache_data
+def get_filtered_tenders(data_version: Tuple, sources: Optional[List[str]] = None, min_score: float = 0.0,
+                         date_range: Optional[Tuple] = None, only_evaluated: bool = False) -> List[Row]:
+    """Get tenders matching the export filters, evaluated in the database; cached per data_version"""
+    db = SessionLocal()
+    try:
+        stmt = select(*EXPORT_COLUMNS)
+        
+        # Most selective predicates first: source membership, then score, then deadline range
+        if sources:
+            stmt = stmt.where(Tender.source_site.in_(sources))
+        
+        if min_score > 0:
+            stmt = stmt.where(Tender.evaluation_score >= min_score)
+        
+        if only_evaluated:
+            stmt = stmt.where(Tender.evaluation_score.isnot(None))
+        
+        if date_range:
+            start_date, end_date = date_range
+            # Compare whole days: deadline.date() in [start_date, end_date]
+            stmt = stmt.where(
+                Tender.deadline >= datetime.combine(start_date, datetime.min.time()),
+                Tender.deadline < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+            )
+        
+        return db.execute(stmt).all()
     finally:
         db.close()
 
@@ -199,14 +439,14 @@ def create_export_interface():
     """Create Streamlit interface for exports"""
     st.subheader("📤 Export Tenders")
     
-    # Load data
-    tenders = get_all_tenders()
+    # Load filter metadata only; tenders are fetched once the filters are known
+    metadata = get_filter_metadata()
     
-    if not tenders:
+    if not metadata['total']:
         st.warning("No tenders found to export.")
         return
     
-    st.info(f"Found {len(tenders)} tenders in database")
+    st.info(f"Found {metadata['total']} tenders in database")
     
     # Export options
     export_format = st.selectbox(
@@ -220,7 +460,7 @@ def create_export_interface():
     
     with col1:
         # Source filter
-        sources = list(set(t.source_site for t in tenders if t.source_site))
+        sources = metadata['sources']
         selected_sources = st.multiselect("Filter by Source:", sources, default=sources)
         
         # Score filter
@@ -228,10 +468,10 @@ def create_export_interface():
     
     with col2:
         # Date range
-        has_deadlines = [t for t in tenders if t.deadline]
+        has_deadlines = metadata['min_deadline'] is not None
         if has_deadlines:
-            min_date = min(t.deadline for t in has_deadlines).date()
-            max_date = max(t.deadline for t in has_deadlines).date()
+            min_date = metadata['min_deadline'].date()
+            max_date = metadata['max_deadline'].date()
             
             date_range = st.date_input(
                 "Deadline Range:",
@@ -244,23 +484,13 @@ def create_export_interface():
         only_evaluated = st.checkbox("Only evaluated tenders", value=True)
     
     # Apply filters
-    filtered_tenders = tenders
-    
-    if selected_sources:
-        filtered_tenders = [t for t in filtered_tenders if t.source_site in selected_sources]
-    
-    if min_score > 0:
-        filtered_tenders = [t for t in filtered_tenders if t.evaluation_score and t.evaluation_score >= min_score]
-    
-    if only_evaluated:
-        filtered_tenders = [t for t in filtered_tenders if t.evaluation_score is not None]
-    
-    if has_deadlines and 'date_range' in locals() and len(date_range) == 2:
-        start_date, end_date = date_range
-        filtered_tenders = [
-            t for t in filtered_tenders 
-            if t.deadline and start_date <= t.deadline.date() <= end_date
-        ]
+    filtered_tenders = get_filtered_tenders(
+        metadata['version'],
+        sources=selected_sources,
+        min_score=min_score,
+        date_range=date_range if has_deadlines and len(date_range) == 2 else None,
+        only_evaluated=only_evaluated
+    )
     
     st.info(f"Filtered to {len(filtered_tenders)} tenders")
     
@@ -274,7 +504,7 @@ def create_export_interface():
         
         try:
             if export_format == "CSV":
-                csv_data = exporter.export_to_csv(filtered_tenders)
+                csv_data = exporter.export_to_csv(filtered_tenders, df=prepare_tender_frame(filtered_tenders))
                 
                 st.download_button(
                     label="📥 Download CSV",
@@ -284,7 +514,7 @@ def create_export_interface():
                 )
                 
             elif export_format == "Excel (XLSX)":
-                excel_data = exporter.export_to_excel(filtered_tenders)
+                excel_data = exporter.export_to_excel(filtered_tenders, df=prepare_tender_frame(filtered_tenders))
                 
                 st.download_button(
                     label="📥 Download Excel",
@@ -330,7 +560,7 @@ def create_export_interface():
                 # Export JSON
                 st.download_button(
                     label="📥 Download Full Report (JSON)",
-                    data=json.dumps(report, indent=2, default=str),
+                    data=report_to_json(report),
                     file_name=f"tender_report_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
                     mime="application/json"
                 )
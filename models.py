@@ -1,21 +1,48 @@
 """
 Database models for the Square Circle Tender Curation System
 """
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey
+from sqlalchemy import create_engine, event, insert, inspect, make_url, Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, scoped_session, relationship, deferred
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.pool import QueuePool, StaticPool
+from contextlib import contextmanager
+import zlib
 from datetime import datetime
 from config import Config
 
 Base = declarative_base()
 
+class CompressedText(TypeDecorator):
+    """Text stored zlib-compressed; rows written before compression are returned as-is"""
+    impl = LargeBinary
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return zlib.compress(value.encode('utf-8'), 6)
+    
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        try:
+            return zlib.decompress(value).decode('utf-8')
+        except zlib.error:
+            # Plain text converted in place from an old TEXT column
+            return bytes(value).decode('utf-8')
+
 class Tender(Base):
     __tablename__ = 'tenders'
+    __table_args__ = (
+        # Covers per-source counts and score aggregates without touching the table
+        Index('idx_source_eval', 'source_site', 'evaluation_score'),
+    )
     
     id = Column(Integer, primary_key=True)
     title = Column(String(500), nullable=False)
     source_site = Column(String(100), nullable=False)
-    url = Column(String(1000), nullable=False)
+    url = Column(String(1000), nullable=False, index=True)
     description = Column(Text)
     funder = Column(String(200))
     sector = Column(String(100))
@@ -23,9 +50,9 @@ class Tender(Base):
     budget_min = Column(Float)
     budget_max = Column(Float)
     budget_currency = Column(String(10), default='USD')
-    deadline = Column(DateTime)
+    deadline = Column(DateTime, index=True)
     project_duration = Column(String(100))
-    scraped_at = Column(DateTime, default=datetime.utcnow)
+    scraped_at = Column(DateTime, default=datetime.utcnow, index=True)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # AI Analysis Results
@@ -35,7 +62,7 @@ class Tender(Base):
     ai_summary = Column(Text)
     
     # Evaluation Results
-    evaluation_score = Column(Float)
+    evaluation_score = Column(Float)  # Indexed by idx_tender_evaluated_desc and idx_source_eval
     sector_score = Column(Float)
     location_score = Column(Float)
     budget_score = Column(Float)
@@ -43,8 +70,8 @@ class Tender(Base):
     experience_score = Column(Float)
     
     # Status
-    is_shortlisted = Column(Boolean, default=False)
-    status = Column(String(50), default='new')  # new, reviewed, applied, rejected
+    is_shortlisted = Column(Boolean, default=False, index=True)
+    status = Column(String(50), default='new', index=True)  # new, reviewed, applied, rejected
     notes = Column(Text)
     
     # Relationships
@@ -53,8 +80,20 @@ class Tender(Base):
     def __repr__(self):
         return f"<Tender(id={self.id}, title='{self.title[:50]}...', source='{self.source_site}')>"
 
+# Ranked listings only ever read evaluated tenders, best first
+Index(
+    'idx_tender_evaluated_desc',
+    Tender.evaluation_score.desc(),
+    sqlite_where=Tender.evaluation_score.isnot(None),
+    postgresql_where=Tender.evaluation_score.isnot(None)
+)
+
 class TenderDocument(Base):
     __tablename__ = 'tender_documents'
+    __table_args__ = (
+        # Attachment dedup looks up by tender and URL; the tender_id prefix serves joins and cleanup
+        Index('idx_document_tender_url', 'tender_id', 'original_url'),
+    )
     
     id = Column(Integer, primary_key=True)
     tender_id = Column(Integer, ForeignKey('tenders.id'), nullable=False)
@@ -67,7 +106,8 @@ class TenderDocument(Base):
     
     # AI Analysis of Document
     ai_analyzed = Column(Boolean, default=False)
-    extracted_text = Column(Text)
+    # Full document text: compressed on disk and only loaded when accessed
+    extracted_text = deferred(Column(CompressedText))
     ai_summary = Column(Text)
     key_requirements = Column(Text)  # JSON string
     
@@ -82,7 +122,7 @@ class ScrapingLog(Base):
     
     id = Column(Integer, primary_key=True)
     site_name = Column(String(100), nullable=False)
-    start_time = Column(DateTime, default=datetime.utcnow)
+    start_time = Column(DateTime, default=datetime.utcnow, index=True)
     end_time = Column(DateTime)
     status = Column(String(50))  # success, failed, partial
     tenders_found = Column(Integer, default=0)
@@ -95,6 +135,10 @@ class ScrapingLog(Base):
 
 class CompanyProfile(Base):
     __tablename__ = 'company_profile'
+    __table_args__ = (
+        # Profile upserts look up by sector and country
+        Index('idx_profile_sector_country', 'sector', 'country'),
+    )
     
     id = Column(Integer, primary_key=True)
     sector = Column(String(100), nullable=False)
@@ -110,12 +154,80 @@ class CompanyProfile(Base):
         return f"<CompanyProfile(sector='{self.sector}', country='{self.country}', experience={self.experience_level})>"
 
 # Database setup
-engine = create_engine(Config.DATABASE_URL)
+def engine_options(database_url) -> dict:
+    """Connection pool settings: sessions are short-lived views over long-lived pooled connections"""
+    url = make_url(database_url)
+    if url.get_backend_name() != 'sqlite':
+        return {'pool_size': Config.DB_POOL_SIZE, 'max_overflow': Config.DB_MAX_OVERFLOW, 'pool_recycle': 3600, 'pool_pre_ping': True}
+    
+    # Pooled SQLite connections are shared across threads (Streamlit, scheduler) and wait on locks;
+    # a larger statement cache keeps the scrape/evaluate queries prepared across calls
+    connect_args = {'check_same_thread': False, 'timeout': 30, 'cached_statements': 256}
+    if url.database in (None, '', ':memory:'):
+        # An in-memory database only exists on its one connection
+        return {'poolclass': StaticPool, 'connect_args': connect_args}
+    return {
+        'poolclass': QueuePool, 'pool_size': Config.DB_POOL_SIZE, 'max_overflow': Config.DB_MAX_OVERFLOW,
+        'pool_pre_ping': True, 'connect_args': connect_args
+    }
+
+# Parsed once and shared by the pool settings and the engine
+DATABASE_URL = make_url(Config.DATABASE_URL)
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        """WAL with relaxed syncing so each commit doesn't fsync the whole journal"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        # Checkpoint every ~1000 pages and truncate the WAL back to 64 MiB afterwards
+        cursor.execute("PRAGMA wal_autocheckpoint=1000")
+        cursor.execute("PRAGMA journal_size_limit=67108864")
+        cursor.close()
+    
+    @event.listens_for(engine, "close")
+    def optimize_sqlite_on_close(dbapi_connection, connection_record):
+        """Let SQLite refresh planner statistics for tables this connection queried"""
+        try:
+            dbapi_connection.execute("PRAGMA optimize")
+        except Exception:
+            pass
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-local session registry for long-lived workers (evaluator, scheduler jobs)
+ScopedSession = scoped_session(SessionLocal)
+
+# Indexes earlier schemas created that are now covered by others
+OBSOLETE_INDEXES = ('ix_tenders_evaluation_score',)
+
+# Columns earlier schemas created as TEXT that now hold compressed bytes. SQLite stores
+# the bytes in the old column as-is; PostgreSQL needs the column converted to BYTEA
+COMPRESSED_COLUMNS = (('tender_documents', 'extracted_text'),)
+
 def create_tables():
     """Create all database tables"""
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add any indexes they're missing
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with engine.begin() as conn:
+        for name in OBSOLETE_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+        if engine.dialect.name == 'postgresql':
+            inspector = inspect(conn)
+            for table, column in COMPRESSED_COLUMNS:
+                column_types = {col['name']: col['type'] for col in inspector.get_columns(table)}
+                if column in column_types and not isinstance(column_types[column], LargeBinary):
+                    # Existing text keeps reading back through CompressedText's plain-text fallback
+                    conn.exec_driver_sql(
+                        f"ALTER TABLE {table} ALTER COLUMN {column} TYPE BYTEA USING convert_to({column}, 'UTF8')"
+                    )
 
 def get_db():
     """Get database session"""
@@ -125,6 +237,24 @@ def get_db():
     finally:
         db.close()
 
+def bulk_insert_chunks(session, mapper, rows, chunk_size: int = Config.BULK_INSERT_CHUNK):
+    """Bulk insert row dicts in fixed-size executemany batches via ORM-enabled insert()"""
+    stmt = insert(mapper)
+    for start in range(0, len(rows), chunk_size):
+        session.execute(stmt, rows[start:start + chunk_size])
+
+@contextmanager
+def session_scope(registry=ScopedSession):
+    """Yield the current thread's session, rolling back on error and releasing it afterwards"""
+    db = registry()
+    try:
+        yield db
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        registry.remove()
+
 if __name__ == "__main__":
     create_tables()
     print("Database tables created successfully!")
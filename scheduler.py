@@ -3,11 +3,13 @@ Scheduler for Daily Automated Scraping
 Runs tender scraping operations on a scheduled basis
 """
 import schedule
-import time
+import signal
+import threading
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from sqlalchemy import func, text
 from scraper_manager import ScrapingManager
-from evaluator import TenderEvaluator
 from models import create_tables
 import os
 
@@ -22,6 +24,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DAILY_SCRAPE_TIME = "08:00"
+
 def daily_scraping_job():
     """Daily scraping and evaluation job"""
     logger.info("Starting daily scraping job...")
@@ -40,6 +44,7 @@ def daily_scraping_job():
         # Run evaluation
         if results['new_tenders'] > 0 or results['updated_tenders'] > 0:
             logger.info("Running evaluation for new/updated tenders...")
+            from evaluator import TenderEvaluator
             evaluator = TenderEvaluator()
             eval_results = evaluator.evaluate_all_tenders()
             evaluator.close()
@@ -52,6 +57,16 @@ def daily_scraping_job():
     except Exception as e:
         logger.error(f"Daily scraping job failed: {str(e)}")
 
+def remove_orphaned_file(path):
+    """Remove a local document file if it still exists"""
+    try:
+        os.remove(path)
+        logger.info(f"Removed orphaned file: {path}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not remove file {path}: {str(e)}")
+
 def weekly_cleanup_job():
     """Weekly cleanup and maintenance job"""
     logger.info("Starting weekly cleanup job...")
@@ -62,28 +77,29 @@ def weekly_cleanup_job():
         
         db = SessionLocal()
         
-        # Clean up old scraping logs (keep last 100)
-        old_logs = db.query(ScrapingLog).order_by(ScrapingLog.start_time.desc()).offset(100).all()
-        for log in old_logs:
-            db.delete(log)
-        
-        # Clean up orphaned documents
-        orphaned_docs = db.query(TenderDocument).filter(
-            ~TenderDocument.tender_id.in_(db.query(Tender.id))
-        ).all()
-        
-        for doc in orphaned_docs:
-            # Remove local file if exists
-            if doc.local_path and os.path.exists(doc.local_path):
-                try:
-                    os.remove(doc.local_path)
-                    logger.info(f"Removed orphaned file: {doc.local_path}")
-                except Exception as e:
-                    logger.warning(f"Could not remove file {doc.local_path}: {str(e)}")
-            
-            db.delete(doc)
+        # Clean up old scraping logs (keep last 100) in one DELETE
+        stale_logs = db.query(ScrapingLog.id).order_by(ScrapingLog.start_time.desc()).offset(100)
+        db.query(ScrapingLog).filter(ScrapingLog.id.in_(stale_logs)).delete(synchronize_session=False)
         
+        # Clean up orphaned documents; only their file paths are loaded
+        orphaned = ~TenderDocument.tender_id.in_(db.query(Tender.id))
+        orphaned_paths = [
+            path for (path,) in db.query(TenderDocument.local_path).filter(orphaned, TenderDocument.local_path.isnot(None))
+        ]
+        db.query(TenderDocument).filter(orphaned).delete(synchronize_session=False)
         db.commit()
+        
+        # Removals are syscall-bound, so overlap them on a small pool
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            executor.map(remove_orphaned_file, orphaned_paths)
+        
+        # Refresh planner statistics after the bulk deletes
+        db.execute(text("ANALYZE"))
+        db.commit()
+        
+        if db.get_bind().dialect.name == 'sqlite':
+            # Fold the cleanup's pages back into the database and reset the WAL file
+            db.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
         db.close()
         
         logger.info("Weekly cleanup completed")
@@ -91,18 +107,53 @@ def weekly_cleanup_job():
     except Exception as e:
         logger.error(f"Weekly cleanup failed: {str(e)}")
 
+def daily_run_missed():
+    """Check whether today's scrape was due but the scheduler wasn't running to start it"""
+    from models import SessionLocal, ScrapingLog
+    
+    hour, minute = map(int, DAILY_SCRAPE_TIME.split(":"))
+    due = datetime.now().replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if datetime.now() < due:
+        return False
+    
+    # The last logged scrape is the persisted run state; logs are stamped in naive UTC
+    due_utc = due.astimezone(timezone.utc).replace(tzinfo=None)
+    db = SessionLocal()
+    try:
+        last_run = db.query(func.max(ScrapingLog.start_time)).scalar()
+    finally:
+        db.close()
+    return last_run is None or last_run < due_utc
+
+def wal_checkpoint_job():
+    """Passive WAL checkpoint; never waits on readers, so it can't stall the dashboard"""
+    try:
+        from models import engine
+        
+        if engine.dialect.name != 'sqlite':
+            return
+        with engine.connect() as conn:
+            busy, log_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(PASSIVE)").one()
+        logger.info(f"WAL checkpoint: {checkpointed}/{log_pages} pages")
+        
+    except Exception as e:
+        logger.error(f"WAL checkpoint failed: {str(e)}")
+
 def health_check_job():
     """Health check job to verify system status"""
     logger.info("Running health check...")
     
     try:
-        from models import SessionLocal
+        from models import engine
         from config import Config
         
-        # Check database connectivity
-        db = SessionLocal()
-        db.execute("SELECT 1")
-        db.close()
+        # Check database connectivity on a bare pooled connection; no Session needed for a ping
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1").scalar()
+            if conn.dialect.name == 'sqlite':
+                # The 6-hourly tick doubles as SQLite's recommended periodic optimize
+                conn.exec_driver_sql("PRAGMA optimize")
+                conn.commit()
         logger.info("✅ Database connection OK")
         
         # Check API configuration
@@ -141,20 +192,45 @@ def main():
     logger.info("- Daily scraping: 08:00 AM")
     logger.info("- Weekly cleanup: Sunday 02:00 AM")
     logger.info("- Health check: Every 6 hours")
+    logger.info("- WAL checkpoint: Every 2 hours")
     
     # Schedule jobs
-    schedule.every().day.at("08:00").do(daily_scraping_job)
+    schedule.every().day.at(DAILY_SCRAPE_TIME).do(daily_scraping_job)
     schedule.every().sunday.at("02:00").do(weekly_cleanup_job)
     schedule.every(6).hours.do(health_check_job)
+    schedule.every(2).hours.do(wal_checkpoint_job)
     
     # Run initial health check
     health_check_job()
     
+    # schedule only keeps jobs in memory, so catch up on a run missed while the process was down
+    if daily_run_missed():
+        logger.info("Today's scheduled scrape was missed, running it now")
+        daily_scraping_job()
+    
+    # Ctrl+C / SIGTERM wake the loop immediately; a second Ctrl+C interrupts a running job
+    stop = threading.Event()
+    
+    def request_stop(signum, frame):
+        logger.info("Stop requested, finishing current job...")
+        stop.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+    
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
     # Main scheduler loop
     try:
-        while True:
+        while not stop.is_set():
             schedule.run_pending()
-            time.sleep(60)  # Check every minute
+            # Wait until the next job is due instead of polling every minute
+            idle = schedule.idle_seconds()
+            if idle is None:
+                break
+            if idle > 0:
+                stop.wait(timeout=min(idle, 3600))
+        if stop.is_set():
+            logger.info("Scheduler stopped by user")
             
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
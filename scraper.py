@@ -3,7 +3,13 @@ Web Scraping Module for Square Circle Tender System
 Handles scraping of both public and login-required tender sites
 """
 import time
+import threading
+import queue
 import requests
+import shutil
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -11,15 +17,18 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import nodriver as uc
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 import chromedriver_autoinstaller
 from fake_useragent import UserAgent
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from urllib.parse import urljoin, urlparse
 import os
 import hashlib
-from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Iterable, List, Dict, Optional, Tuple
 from config import Config
 from models import Tender, TenderDocument, ScrapingLog, SessionLocal
 import re
@@ -28,32 +37,250 @@ import re
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Detail pages are parsed without the document wrappers and top-level script/style/head blocks;
+# content elements (with everything nested in them) are kept, <title> included
+PAGE_STRAINER = SoupStrainer(re.compile(r'^(?!(?:html|head|body|script|style|noscript|svg|template|link|meta)$)'))
+
+def compile_selectors(selectors: Iterable[str]) -> Tuple:
+    """Compile a priority-ordered selector list into its combined query and the individual selectors"""
+    selectors = tuple(selectors)
+    return sv.compile(', '.join(selectors)), tuple(sv.compile(selector) for selector in selectors)
+
+@lru_cache(maxsize=None)
+def user_agents() -> UserAgent:
+    """The user-agent database, loaded on first use and then once per process rather than once per scraper"""
+    return UserAgent()
+
+# Parsing tables built once at import rather than per tender page
+DETAIL_FIELDS = ('title', 'description', 'deadline', 'budget')
+FALLBACK_TITLE_SELECTORS = compile_selectors(('title', 'h1', 'h2', '.title', '.page-title', '.entry-title'))
+CONTENT_SELECTORS = compile_selectors(('main', '.content', '.main-content', 'article', '.article'))
+# Each deadline pattern maps straight to the formats its match can be in (separators normalised to '/')
+DEADLINE_PATTERNS = (
+    (re.compile(r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})'), ('%d/%m/%Y', '%m/%d/%Y')),  # DD/MM/YYYY or MM/DD/YYYY
+    (re.compile(r'(\d{4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})'), ('%Y/%m/%d',)),             # YYYY/MM/DD
+    (re.compile(r'(\d{1,2}\s+\w+\s+\d{4})'), ('%d %B %Y',)),                           # DD Month YYYY
+    (re.compile(r'(\w+\s+\d{1,2},?\s+\d{4})'), ('%B %d, %Y', '%B %d %Y')),             # Month DD, YYYY
+)
+DATE_SEPARATOR_RE = re.compile(r'[\-\.]')
+CURRENCIES = ('USD', 'EUR', 'GBP', 'AUD', 'CAD')
+BUDGET_NUMBER_RE = re.compile(r'[\d,]+\.?\d*')
+SECTOR_KEYWORDS = (
+    'climate', 'environment', 'governance', 'infrastructure', 'health',
+    'education', 'agriculture', 'water', 'energy', 'development'
+)
+COUNTRY_KEYWORDS = (
+    'australia', 'fiji', 'vanuatu', 'solomon islands', 'papua new guinea',
+    'tonga', 'samoa', 'kiribati', 'tuvalu', 'nauru', 'palau', 'marshall islands',
+    'pacific', 'asia', 'africa', 'latin america'
+)
+ATTACHMENT_PATTERNS = ('.pdf', '.doc', '.docx', '.rtf')
+SECTOR_RE = re.compile('|'.join(map(re.escape, SECTOR_KEYWORDS)), re.IGNORECASE)
+COUNTRY_RE = re.compile('|'.join(map(re.escape, COUNTRY_KEYWORDS)), re.IGNORECASE)
+ATTACHMENT_RE = re.compile('|'.join(map(re.escape, ATTACHMENT_PATTERNS)), re.IGNORECASE)
+INVALID_LINK_PREFIXES = ('javascript:', 'mailto:', '#', 'tel:')
+EXCLUDED_LINK_PATTERNS = (
+    '/careers', '/about', '/contact', '/press', '/subscribe',
+    '/board-of-directors', '/executive-leadership', '/expertise',
+    '/impact/', '/doing-business-with-abt$'  # Main page, not specific solicitations
+)
+INVALID_LINK_RE = re.compile('|'.join(map(re.escape, INVALID_LINK_PREFIXES)))
+EXCLUDED_LINK_RE = re.compile('|'.join(map(re.escape, EXCLUDED_LINK_PATTERNS)))
+
+# Upper bounds for waiting on dynamic content; the waits return as soon as it shows up
+PAGE_WAIT_TIMEOUT = 10
+DETAIL_WAIT_TIMEOUT = 5
+
+# Resources the browser never needs to fetch since only the DOM is read
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.css', '*.mp4', '*.webm',
+    '*doubleclick.net*', '*google-analytics.com*', '*googletagmanager.com*'
+]
+
+# Returned by a conditional fetch when the page hasn't changed since it was last scraped
+NOT_MODIFIED = object()
+
+class RateLimiter:
+    """Spaces out request starts across threads so parallel fetches stay polite"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+    
+    def wait(self):
+        """Block until this caller's slot comes up"""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+class DriverPool:
+    """Keeps Chrome drivers warm between sites, recycling each after a number of page loads"""
+    
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self.idle = queue.Queue()
+        self.pages_served = {}
+        self.lock = threading.Lock()
+    
+    def acquire(self, factory) -> webdriver.Chrome:
+        """Borrow an idle driver, starting a new one with factory if none are free"""
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            driver = factory()
+            with self.lock:
+                self.pages_served[id(driver)] = 0
+            return driver
+    
+    def release(self, driver: webdriver.Chrome, pages: int):
+        """Return a driver to the pool, or quit it if it's worn out or no longer responding"""
+        with self.lock:
+            served = self.pages_served.get(id(driver), 0) + pages
+            self.pages_served[id(driver)] = served
+        
+        try:
+            driver.current_url  # Cheap liveness check
+            healthy = True
+        except Exception:
+            healthy = False
+        
+        if healthy and served < self.max_pages:
+            self.idle.put(driver)
+        else:
+            self.discard(driver)
+    
+    def discard(self, driver: webdriver.Chrome):
+        """Quit a driver and forget it"""
+        with self.lock:
+            self.pages_served.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {str(e)}")
+    
+    def close(self):
+        """Quit every idle driver"""
+        while True:
+            try:
+                self.discard(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+def http_date(moment: datetime) -> str:
+    """Format a naive UTC datetime for HTTP headers"""
+    return format_datetime(moment.replace(tzinfo=timezone.utc), usegmt=True)
+
+def not_modified(response: requests.Response, since: datetime) -> bool:
+    """Whether a response shows the page hasn't changed since the given (naive UTC) time"""
+    if response.status_code == 304:
+        return True
+    
+    last_modified = response.headers.get('Last-Modified')
+    if not last_modified:
+        return False
+    try:
+        modified = parsedate_to_datetime(last_modified)
+    except (TypeError, ValueError):
+        return False
+    if modified.tzinfo:
+        modified = modified.astimezone(timezone.utc).replace(tzinfo=None)
+    return modified <= since
+
+def create_http_session() -> requests.Session:
+    """Create a requests session with a keep-alive pool and retries on transient errors"""
+    session = requests.Session()
+    # Pool sized for the parallel page and attachment fetches
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=Retry(total=3, backoff_factor=0.3))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def download_attachment(session: requests.Session, attachment: Dict, tender_id: int) -> Optional[str]:
+    """Download attachment file over the given session and return local path"""
+    try:
+        url = attachment['url']
+        filename = attachment['filename']
+        
+        # Create unique filename to avoid conflicts
+        hash_suffix = hashlib.md5(url.encode()).hexdigest()[:8]
+        safe_filename = f"{tender_id}_{hash_suffix}_{filename}"
+        local_path = os.path.join(Config.ATTACHMENT_PATH, safe_filename)
+        
+        # Files are only renamed into place once complete, so one already on disk can be reused
+        if os.path.exists(local_path) and os.path.getsize(local_path) > 0:
+            logger.info(f"Attachment already downloaded: {safe_filename}")
+            return local_path
+        
+        # Stream the file to disk rather than holding it in memory
+        partial_path = f"{local_path}.part"
+        with session.get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            
+            with open(partial_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=65536)
+        os.replace(partial_path, local_path)
+        
+        logger.info(f"Downloaded attachment: {safe_filename}")
+        return local_path
+        
+    except Exception as e:
+        logger.error(f"Error downloading attachment {attachment['url']}: {str(e)}")
+        return None
+
 class TenderScraper:
     """Base class for scraping tender sites"""
     
-    def __init__(self, site_config: Dict):
-        """Initialize scraper with site configuration"""
+    # chromedriver only needs installing once per process, not once per scraper
+    _driver_installed = False
+    _driver_install_lock = threading.Lock()
+    
+    def __init__(self, site_config: Dict, driver_pool: Optional[DriverPool] = None):
+        """Initialize scraper with site configuration and optionally a shared driver pool"""
         self.site_config = site_config
-        self.session = requests.Session()
-        self.ua = UserAgent()
+        self.driver_pool = driver_pool
+        self.pages_loaded = 0
+        # Field selectors are split and compiled once per scraper instead of on every page
+        configured = site_config.get('selectors', {})
+        self.selectors = {
+            field: compile_selectors(configured[field].split(', ')) for field in DETAIL_FIELDS if field in configured
+        }
+        self.session = create_http_session()
+        # One user agent per scraper, shared by its HTTP session and browser
+        self.user_agent = user_agents().random
+        self.session.headers['User-Agent'] = self.user_agent
+        self.rate_limiter = RateLimiter(Config.scraping.delay_between_requests)
         self.driver = None
         self.scraped_tenders = []
         self.browser = uc.start()
-        # Setup Chrome driver
-        chromedriver_autoinstaller.install()
         
     def setup_driver(self) -> webdriver.Chrome:
         """Setup Chrome WebDriver with appropriate options"""
+        with TenderScraper._driver_install_lock:
+            if not TenderScraper._driver_installed:
+                chromedriver_autoinstaller.install()
+                TenderScraper._driver_installed = True
+        
         chrome_options = Options()
         chrome_options.add_argument('--headless')  # Run in background
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument(f'--user-agent={self.ua.random}')
+        chrome_options.add_argument(f'--user-agent={self.user_agent}')
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
         
         driver = webdriver.Chrome(options=chrome_options)
         driver.set_page_load_timeout(Config.scraping.timeout)
+        
+        # Skip images, fonts, stylesheets and trackers on every page load
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
         return driver
     
     def login_if_required(self) -> bool:
@@ -63,7 +290,7 @@ class TenderScraper:
         
         try:
             login_url = self.site_config['login_url']
-            self.driver.get(login_url)
+            self.load_page(login_url)
             
             # Wait for login form to load
             WebDriverWait(self.driver, 10).until(
@@ -94,8 +321,13 @@ class TenderScraper:
             password_field.send_keys(password)
             login_button.click()
             
-            # Wait for login to complete
-            time.sleep(3)
+            # Wait for login to complete (the redirect away from the login page)
+            try:
+                WebDriverWait(self.driver, PAGE_WAIT_TIMEOUT).until(
+                    lambda driver: 'login' not in driver.current_url.lower() and 'sign-in' not in driver.current_url.lower()
+                )
+            except TimeoutException:
+                pass
             
             # Check if login was successful (basic check)
             current_url = self.driver.current_url
@@ -109,34 +341,86 @@ class TenderScraper:
             logger.error(f"Login failed for {self.site_config['name']}: {str(e)}")
             return False
 
+    def get_driver(self) -> webdriver.Chrome:
+        """Start the browser on first use"""
+        if self.driver is None:
+            if self.driver_pool:
+                self.driver = self.driver_pool.acquire(self.setup_driver)
+            else:
+                self.driver = self.setup_driver()
+        return self.driver
+    
+    def share_browser_cookies(self):
+        """Copy the browser's cookies into the HTTP session"""
+        for cookie in self.driver.get_cookies():
+            self.session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'),
+                secure=cookie.get('secure', False)
+            )
+    
+    def load_page(self, url: str) -> webdriver.Chrome:
+        """Navigate the browser to url, counting the load against the driver"""
+        driver = self.get_driver()
+        self.pages_loaded += 1
+        driver.get(url)
+        return driver
+    
+    def release_driver(self):
+        """Hand the browser back to the pool, or quit it if there isn't one"""
+        if self.driver is None:
+            return
+        if self.driver_pool:
+            self.driver_pool.release(self.driver, self.pages_loaded)
+        else:
+            self.driver.quit()
+        self.driver = None
+        self.pages_loaded = 0
+    
     def extract_tender_links(self) -> List[str]:
         """Extract tender links from search/listing page"""
         try:
             search_url = self.site_config['search_url']
-            self.driver.get(search_url)
+            link_selector = self.site_config['selectors']['tender_links']
+            hrefs = []
             
-            # Wait for page to load
-            time.sleep(3)
+            # Server-rendered listings are read over HTTP; the browser is only used
+            # when it's already running (login/JS sites) or the plain fetch finds nothing
+            if self.driver is None:
+                html = self.fetch_html(search_url)
+                if html:
+                    soup = BeautifulSoup(html, 'lxml')
+                    hrefs = [urljoin(search_url, link['href']) for link in soup.select(link_selector) if link.get('href')]
             
-            # Extract links using CSS selectors
-            link_selector = self.site_config['selectors']['tender_links']
-            link_elements = self.driver.find_elements(By.CSS_SELECTOR, link_selector)
+            if not hrefs:
+                driver = self.load_page(search_url)
+                
+                # Wait for the listing links to render
+                try:
+                    WebDriverWait(driver, PAGE_WAIT_TIMEOUT).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, link_selector))
+                    )
+                except TimeoutException:
+                    logger.warning(f"Timed out waiting for tender links on {self.site_config['name']}")
+                
+                # Read every matching href in one script call rather than one round-trip per element
+                hrefs = driver.execute_script(
+                    "return Array.from(document.querySelectorAll(arguments[0]), el => el.href).filter(Boolean);",
+                    link_selector
+                )
             
             links = []
-            invalid_prefixes = ['javascript:', 'mailto:', '#', 'tel:']
-            exclude_patterns = [
-                '/careers', '/about', '/contact', '/press', '/subscribe', 
-                '/board-of-directors', '/executive-leadership', '/expertise',
-                '/impact/', '/doing-business-with-abt$'  # Main page, not specific solicitations
-            ]
-            
-            for element in link_elements:
-                href = element.get_attribute('href')
-                if href and not any(href.startswith(prefix) for prefix in invalid_prefixes):
+            seen = set()
+            
+            for href in hrefs:
+                if href and not INVALID_LINK_RE.match(href):
                     # Skip general navigation links
-                    if not any(pattern in href for pattern in exclude_patterns):
+                    if not EXCLUDED_LINK_RE.search(href):
                         full_url = urljoin(self.site_config['base_url'], href)
-                        if full_url not in links:  # Avoid duplicates
+                        if full_url not in seen:  # Avoid duplicates
+                            seen.add(full_url)
                             links.append(full_url)
             
             logger.info(f"Found {len(links)} tender links on {self.site_config['name']}")
@@ -149,11 +433,61 @@ class TenderScraper:
     def scrape_tender_details(self, url: str) -> Optional[Dict]:
         """Scrape details from individual tender page"""
         try:
-            self.driver.get(url)
-            time.sleep(2)
-            
-            # Get page source for BeautifulSoup parsing
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            driver = self.load_page(url)
+            self.wait_for_details(driver)
+            return self.parse_tender_html(driver.page_source, url)
+        except Exception as e:
+            logger.error(f"Error scraping tender details from {url}: {str(e)}")
+            return None
+    
+    def wait_for_details(self, driver: webdriver.Chrome):
+        """Wait until the page has loaded and, if the site has a title selector, until it matches"""
+        title_selector = self.selectors['title'][0].pattern if 'title' in self.selectors else ''
+        
+        def ready(driver):
+            if driver.execute_script('return document.readyState') != 'complete':
+                return False
+            return not title_selector or bool(driver.find_elements(By.CSS_SELECTOR, title_selector))
+        
+        try:
+            WebDriverWait(driver, DETAIL_WAIT_TIMEOUT).until(ready)
+        except TimeoutException:
+            # Parse whatever has rendered; the title has its own fallbacks
+            pass
+    
+    def fetch_html(self, url: str, modified_since: Optional[datetime] = None):
+        """Fetch a page over the shared HTTP session, without a browser; NOT_MODIFIED if unchanged since modified_since"""
+        try:
+            self.rate_limiter.wait()
+            headers = {'If-Modified-Since': http_date(modified_since)} if modified_since else None
+            response = self.session.get(url, timeout=Config.scraping.timeout, headers=headers)
+            if modified_since and not_modified(response, modified_since):
+                return NOT_MODIFIED
+            response.raise_for_status()
+            if not response.text.strip():
+                raise ValueError('empty response body')
+            return response.text
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed for {url}, falling back to browser: {str(e)}")
+            return None
+    
+    def is_unchanged(self, url: str, modified_since: datetime) -> bool:
+        """Check with a conditional HEAD request whether a page has changed since it was last scraped (caller paces it)"""
+        try:
+            response = self.session.head(
+                url,
+                timeout=Config.scraping.timeout,
+                headers={'If-Modified-Since': http_date(modified_since)},
+                allow_redirects=True
+            )
+            return not_modified(response, modified_since)
+        except Exception:
+            return False
+    
+    def parse_tender_html(self, html: str, url: str) -> Optional[Dict]:
+        """Extract tender fields from a detail page's HTML"""
+        try:
+            soup = BeautifulSoup(html, 'lxml', parse_only=PAGE_STRAINER)
             
             tender_data = {
                 'url': url,
@@ -162,22 +496,11 @@ class TenderScraper:
             }
             
             # Extract title with fallbacks
-            title = None
-            title_selectors = self.site_config['selectors']['title'].split(', ')
-            for selector in title_selectors:
-                title_element = soup.select_one(selector)
-                if title_element and title_element.get_text(strip=True):
-                    title = title_element.get_text(strip=True)
-                    break
+            title = self.first_text(soup, self.selectors['title'])
             
             # If no title found, try common fallbacks
             if not title:
-                fallback_selectors = ['title', 'h1', 'h2', '.title', '.page-title', '.entry-title']
-                for selector in fallback_selectors:
-                    element = soup.select_one(selector)
-                    if element and element.get_text(strip=True):
-                        title = element.get_text(strip=True)
-                        break
+                title = self.first_text(soup, FALLBACK_TITLE_SELECTORS)
             
             # If still no title, generate from URL
             if not title:
@@ -186,50 +509,35 @@ class TenderScraper:
             tender_data['title'] = title
             
             # Extract description with fallbacks
-            description = None
-            desc_selectors = self.site_config['selectors']['description'].split(', ')
-            for selector in desc_selectors:
-                desc_element = soup.select_one(selector)
-                if desc_element and desc_element.get_text(strip=True):
-                    description = desc_element.get_text(strip=True)
-                    break
+            description = self.first_text(soup, self.selectors['description'])
             
             # If no description found, try to extract from page content
             if not description:
                 # Get main content areas
-                content_selectors = ['main', '.content', '.main-content', 'article', '.article']
-                for selector in content_selectors:
-                    content_element = soup.select_one(selector)
-                    if content_element:
-                        text = content_element.get_text(strip=True)
-                        if len(text) > 50:  # Ensure it's substantial content
-                            description = text[:500] + "..." if len(text) > 500 else text
-                            break
+                for content_element in self.select_by_priority(soup, CONTENT_SELECTORS):
+                    text = content_element.get_text(strip=True)
+                    if len(text) > 50:  # Ensure it's substantial content
+                        description = text[:500] + "..." if len(text) > 500 else text
+                        break
             
             tender_data['description'] = description
             
             # Extract deadline
-            deadline_selectors = self.site_config['selectors']['deadline'].split(', ')
-            for selector in deadline_selectors:
-                deadline_element = soup.select_one(selector)
-                if deadline_element:
-                    deadline_text = deadline_element.get_text(strip=True)
-                    tender_data['deadline'] = self.parse_deadline(deadline_text)
-                    break
+            deadline_elements = self.select_by_priority(soup, self.selectors['deadline'])
+            if deadline_elements:
+                deadline_text = deadline_elements[0].get_text(strip=True)
+                tender_data['deadline'] = self.parse_deadline(deadline_text)
             
             # Extract budget
-            budget_selectors = self.site_config['selectors']['budget'].split(', ')
-            for selector in budget_selectors:
-                budget_element = soup.select_one(selector)
-                if budget_element:
-                    budget_text = budget_element.get_text(strip=True)
-                    budget_info = self.parse_budget(budget_text)
-                    tender_data.update(budget_info)
-                    break
+            budget_elements = self.select_by_priority(soup, self.selectors['budget'])
+            if budget_elements:
+                budget_text = budget_elements[0].get_text(strip=True)
+                budget_info = self.parse_budget(budget_text)
+                tender_data.update(budget_info)
             
             # Extract additional information from page content
-            page_text = soup.get_text()
-            tender_data.update(self.extract_additional_info(page_text))
+            # (streamed string by string rather than joined into one copy of the page)
+            tender_data.update(self.extract_additional_info(soup.stripped_strings))
             
             # Find and download attachments
             attachments = self.find_attachments(soup, url)
@@ -238,35 +546,48 @@ class TenderScraper:
             return tender_data
             
         except Exception as e:
-            logger.error(f"Error scraping tender details from {url}: {str(e)}")
+            logger.error(f"Error parsing tender details from {url}: {str(e)}")
             return None
     
+    @staticmethod
+    def select_by_priority(soup: BeautifulSoup, selectors: Tuple) -> List:
+        """First match of each selector, in selector order, from one combined pass over the tree"""
+        combined, individual = selectors
+        
+        # The combined query returns matches in document order, so priority is restored
+        # by checking each selector against just those elements
+        matches = combined.select(soup)
+        found = []
+        for selector in individual:
+            element = next((match for match in matches if selector.match(match)), None)
+            if element is not None:
+                found.append(element)
+        return found
+    
+    @staticmethod
+    def first_text(soup: BeautifulSoup, selectors: Tuple) -> Optional[str]:
+        """Stripped text of the first selector whose match has any; each element's text is extracted once"""
+        for element in TenderScraper.select_by_priority(soup, selectors):
+            text = element.get_text(strip=True)
+            if text:
+                return text
+        return None
+    
     def parse_deadline(self, deadline_text: str) -> Optional[datetime]:
         """Parse deadline text into datetime object"""
         if not deadline_text:
             return None
         
-        # Common date patterns
-        patterns = [
-            r'(\d{1,2}[\/\-\.]\d{1,2}[\/\-\.]\d{4})',  # DD/MM/YYYY or MM/DD/YYYY
-            r'(\d{4}[\/\-\.]\d{1,2}[\/\-\.]\d{1,2})',  # YYYY/MM/DD
-            r'(\d{1,2}\s+\w+\s+\d{4})',                # DD Month YYYY
-            r'(\w+\s+\d{1,2},?\s+\d{4})',              # Month DD, YYYY
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, deadline_text)
+        # Common date patterns, each tried only against its own formats
+        for pattern, formats in DEADLINE_PATTERNS:
+            match = pattern.search(deadline_text)
             if match:
-                try:
-                    date_str = match.group(1)
-                    # Try different parsing formats
-                    for fmt in ['%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d', '%d %B %Y', '%B %d, %Y', '%d-%m-%Y']:
-                        try:
-                            return datetime.strptime(date_str, fmt)
-                        except ValueError:
-                            continue
-                except:
-                    pass
+                date_str = DATE_SEPARATOR_RE.sub('/', match.group(1))
+                for fmt in formats:
+                    try:
+                        return datetime.strptime(date_str, fmt)
+                    except ValueError:
+                        continue
         
         return None
     
@@ -282,24 +603,28 @@ class TenderScraper:
             return budget_info
         
         # Extract currency
-        currencies = ['USD', 'EUR', 'GBP', 'AUD', 'CAD']
-        for currency in currencies:
-            if currency in budget_text.upper():
+        upper_text = budget_text.upper()
+        for currency in CURRENCIES:
+            if currency in upper_text:
                 budget_info['budget_currency'] = currency
                 break
         
         # Extract numbers (remove commas, handle millions/thousands)
-        numbers = re.findall(r'[\d,]+\.?\d*', budget_text.replace(',', ''))
+        numbers = BUDGET_NUMBER_RE.findall(budget_text.replace(',', ''))
         parsed_numbers = []
         
+        # The unit multiplier depends only on the text, so work it out once
+        lower_text = budget_text.lower()
+        if 'million' in lower_text or 'mil' in lower_text:
+            multiplier = 1000000
+        elif 'thousand' in lower_text or 'k' in lower_text:
+            multiplier = 1000
+        else:
+            multiplier = 1
+        
         for num_str in numbers:
             try:
-                num = float(num_str)
-                # Handle millions and thousands
-                if 'million' in budget_text.lower() or 'mil' in budget_text.lower():
-                    num *= 1000000
-                elif 'thousand' in budget_text.lower() or 'k' in budget_text.lower():
-                    num *= 1000
+                num = float(num_str) * multiplier
                 parsed_numbers.append(num)
             except ValueError:
                 pass
@@ -313,35 +638,25 @@ class TenderScraper:
         
         return budget_info
     
-    def extract_additional_info(self, page_text: str) -> Dict:
-        """Extract additional information from page text using patterns"""
+    def extract_additional_info(self, page_strings: Iterable[str]) -> Dict:
+        """Extract additional information from the page's text strings using patterns"""
         info = {}
         
-        # Extract sector/industry keywords
-        sector_keywords = [
-            'climate', 'environment', 'governance', 'infrastructure', 'health',
-            'education', 'agriculture', 'water', 'energy', 'development'
-        ]
+        # One pass over the text collects both sector and location keywords
+        matched_sectors = set()
+        matched_locations = set()
+        for text in page_strings:
+            matched_sectors.update(match.lower() for match in SECTOR_RE.findall(text))
+            matched_locations.update(match.lower() for match in COUNTRY_RE.findall(text))
         
-        found_sectors = []
-        for keyword in sector_keywords:
-            if keyword in page_text.lower():
-                found_sectors.append(keyword)
+        # Extract sector/industry keywords
+        found_sectors = [keyword for keyword in SECTOR_KEYWORDS if keyword in matched_sectors]
         
         if found_sectors:
             info['sector'] = ', '.join(found_sectors[:3])  # Top 3 sectors
         
         # Extract location information
-        countries = [
-            'australia', 'fiji', 'vanuatu', 'solomon islands', 'papua new guinea',
-            'tonga', 'samoa', 'kiribati', 'tuvalu', 'nauru', 'palau', 'marshall islands',
-            'pacific', 'asia', 'africa', 'latin america'
-        ]
-        
-        found_locations = []
-        for country in countries:
-            if country in page_text.lower():
-                found_locations.append(country.title())
+        found_locations = [country.title() for country in COUNTRY_KEYWORDS if country in matched_locations]
         
         if found_locations:
             info['location'] = ', '.join(found_locations[:3])
@@ -353,15 +668,19 @@ class TenderScraper:
         attachments = []
         
         # Look for PDF and Word document links
-        file_patterns = ['.pdf', '.doc', '.docx', '.rtf']
-        
         for link in soup.find_all('a', href=True):
             href = link['href']
             link_text = link.get_text(strip=True)
             
+            # Most anchors are navigation; reject them with one regex search before the per-type checks
+            if not (ATTACHMENT_RE.search(href) or ATTACHMENT_RE.search(link_text)):
+                continue
+            
             # Check if link points to a document
-            for pattern in file_patterns:
-                if pattern in href.lower() or pattern in link_text.lower():
+            href_lower = href.lower()
+            text_lower = link_text.lower()
+            for pattern in ATTACHMENT_PATTERNS:
+                if pattern in href_lower or pattern in text_lower:
                     full_url = urljoin(base_url, href)
                     attachments.append({
                         'url': full_url,
@@ -375,42 +694,28 @@ class TenderScraper:
     
     def download_attachment(self, attachment: Dict, tender_id: int) -> Optional[str]:
         """Download attachment file and return local path"""
-        try:
-            url = attachment['url']
-            filename = attachment['filename']
-            
-            # Create unique filename to avoid conflicts
-            hash_suffix = hashlib.md5(url.encode()).hexdigest()[:8]
-            safe_filename = f"{tender_id}_{hash_suffix}_{filename}"
-            local_path = os.path.join(Config.ATTACHMENT_PATH, safe_filename)
-            
-            # Download file
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            with open(local_path, 'wb') as f:
-                f.write(response.content)
-            
-            logger.info(f"Downloaded attachment: {safe_filename}")
-            return local_path
-            
-        except Exception as e:
-            logger.error(f"Error downloading attachment {attachment['url']}: {str(e)}")
-            return None
+        return download_attachment(self.session, attachment, tender_id)
     
-    def scrape_site(self) -> List[Dict]:
-        """Main method to scrape the entire site"""
+    def scrape_site(self, known_tenders: Optional[Dict[str, datetime]] = None) -> List[Dict]:
+        """Main method to scrape the entire site, skipping known tenders (url -> last scraped) that haven't changed"""
         logger.info(f"Starting scrape of {self.site_config['name']}")
+        known_tenders = known_tenders or {}
+        skipped = 0
         
         try:
-            # Setup driver
-            self.driver = self.setup_driver()
+            # Only sites that log in or render with JavaScript start the browser up front
+            if self.site_config.get('requires_login', False) or self.site_config.get('needs_js', False):
+                self.get_driver()
             
             # Login if required
             if not self.login_if_required():
                 logger.error(f"Failed to login to {self.site_config['name']}")
                 return []
             
+            # Detail pages fetched over HTTP must carry the logged-in session
+            if self.site_config.get('requires_login', False):
+                self.share_browser_cookies()
+            
             # Extract tender links
             tender_links = self.extract_tender_links()
             
@@ -418,18 +723,41 @@ class TenderScraper:
                 logger.warning(f"No tender links found on {self.site_config['name']}")
                 return []
             
-            # Scrape each tender
+            tender_links = tender_links[:20]  # Limit for demo
             scraped_tenders = []
-            for i, link in enumerate(tender_links[:20]):  # Limit for demo
-                logger.info(f"Scraping tender {i+1}/{min(len(tender_links), 20)}: {link}")
-                
-                tender_data = self.scrape_tender_details(link)
-                if tender_data:
-                    scraped_tenders.append(tender_data)
+            
+            if self.site_config.get('needs_js', False):
+                # Scrape each tender in the browser; one rate limiter slot covers a tender's HEAD and page load
+                for i, link in enumerate(tender_links):
+                    self.rate_limiter.wait()
+                    if link in known_tenders and self.is_unchanged(link, known_tenders[link]):
+                        skipped += 1
+                        continue
+                    
+                    logger.info(f"Scraping tender {i+1}/{len(tender_links)}: {link}")
+                    
+                    tender_data = self.scrape_tender_details(link)
+                    if tender_data:
+                        scraped_tenders.append(tender_data)
+            else:
+                # Detail pages are fetched over HTTP in parallel (still rate limited) and parsed here;
+                # any page that can't be fetched that way goes through the browser instead
+                logger.info(f"Fetching {len(tender_links)} tender pages from {self.site_config['name']}")
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    pages = list(executor.map(
+                        lambda link: self.fetch_html(link, known_tenders.get(link)), tender_links
+                    ))
                 
-                # Add delay between requests
-                time.sleep(Config.scraping.delay_between_requests)
+                for link, html in zip(tender_links, pages):
+                    if html is NOT_MODIFIED:
+                        skipped += 1
+                        continue
+                    tender_data = self.parse_tender_html(html, link) if html else self.scrape_tender_details(link)
+                    if tender_data:
+                        scraped_tenders.append(tender_data)
             
+            if skipped:
+                logger.info(f"Skipped {skipped} unchanged tenders on {self.site_config['name']}")
             logger.info(f"Successfully scraped {len(scraped_tenders)} tenders from {self.site_config['name']}")
             return scraped_tenders
             
@@ -438,8 +766,7 @@ class TenderScraper:
             return []
         
         finally:
-            if self.driver:
-                self.driver.quit()
+            self.release_driver()
 
 class ScrapingManager:
     """Manages scraping operations across multiple sites"""
@@ -447,6 +774,8 @@ class ScrapingManager:
     def __init__(self):
         """Initialize scraping manager"""
         self.db = SessionLocal()
+        # Shared by attachment downloads across all tenders
+        self.session = create_http_session()
     
     def scrape_all_sites(self) -> Dict:
         """Scrape all configured sites and return summary"""
@@ -460,144 +789,239 @@ class ScrapingManager:
             'site_results': {}
         }
         
+        # Scrapers and their log rows are created on this thread; one commit opens every log.
+        # Browsers started by one site are handed on to the next rather than relaunched
+        driver_pool = DriverPool(Config.scraping.driver_max_pages)
+        
+        # When each known tender was last scraped, so unchanged detail pages can be skipped
+        known_tenders = {}
+        for source_site, url, scraped_at in self.db.query(Tender.source_site, Tender.url, Tender.scraped_at).filter(
+            Tender.scraped_at.isnot(None)
+        ):
+            known_tenders.setdefault(source_site, {})[url] = scraped_at
+        
+        jobs = []
         for site_key, site_config in Config.SITES_CONFIG.items():
-            logger.info(f"Starting scrape of {site_config['name']}")
-            
-            # Create scraping log entry
             log = ScrapingLog(
                 site_name=site_config['name'],
                 start_time=datetime.utcnow(),
                 status='running'
             )
             self.db.add(log)
-            self.db.commit()
-            
             try:
-                # Create scraper and run
-                scraper = TenderScraper(site_config)
-                tender_data_list = scraper.scrape_site()
-                
-                # Process scraped data
-                site_stats = self.process_scraped_data(tender_data_list, site_config['name'])
-                
-                # Update log
-                log.end_time = datetime.utcnow()
-                log.status = 'success'
-                log.tenders_found = len(tender_data_list)
-                log.tenders_new = site_stats['new']
-                log.tenders_updated = site_stats['updated']
-                
-                results['successful_sites'] += 1
-                results['total_tenders'] += len(tender_data_list)
-                results['new_tenders'] += site_stats['new']
-                results['updated_tenders'] += site_stats['updated']
-                results['site_results'][site_config['name']] = site_stats
-                
+                jobs.append((TenderScraper(site_config, driver_pool), log))
             except Exception as e:
-                logger.error(f"Failed to scrape {site_config['name']}: {str(e)}")
-                
-                # Update log
+                logger.error(f"Failed to start scraper for {site_config['name']}: {str(e)}")
                 log.end_time = datetime.utcnow()
                 log.status = 'failed'
                 log.error_message = str(e)
-                
                 results['failed_sites'] += 1
                 results['site_results'][site_config['name']] = {'error': str(e)}
+        self.db.commit()
+        
+        if not jobs:
+            driver_pool.close()
+            return results
+        
+        # Each site is a separate host and the work is network/browser bound, so sites run
+        # side by side; results are saved here as they finish so the session stays on one thread
+        with ThreadPoolExecutor(max_workers=min(Config.scraping.max_concurrent_sites, len(jobs))) as executor:
+            futures = {}
+            for scraper, log in jobs:
+                logger.info(f"Starting scrape of {scraper.site_config['name']}")
+                site_known = known_tenders.get(scraper.site_config['name'], {})
+                futures[executor.submit(scraper.scrape_site, site_known)] = (scraper.site_config, log)
             
-            finally:
-                self.db.commit()
+            for future in as_completed(futures):
+                site_config, log = futures[future]
+                try:
+                    tender_data_list = future.result()
+                    
+                    # Process scraped data
+                    site_stats = self.process_scraped_data(tender_data_list, site_config['name'])
+                    
+                    # Update log
+                    log.end_time = datetime.utcnow()
+                    log.status = 'success'
+                    log.tenders_found = len(tender_data_list)
+                    log.tenders_new = site_stats['new']
+                    log.tenders_updated = site_stats['updated']
+                    
+                    results['successful_sites'] += 1
+                    results['total_tenders'] += len(tender_data_list)
+                    results['new_tenders'] += site_stats['new']
+                    results['updated_tenders'] += site_stats['updated']
+                    results['site_results'][site_config['name']] = site_stats
+                    
+                except Exception as e:
+                    logger.error(f"Failed to scrape {site_config['name']}: {str(e)}")
+                    
+                    # Update log
+                    log.end_time = datetime.utcnow()
+                    log.status = 'failed'
+                    log.error_message = str(e)
+                    
+                    results['failed_sites'] += 1
+                    results['site_results'][site_config['name']] = {'error': str(e)}
+                
+                finally:
+                    self.db.commit()
         
+        driver_pool.close()
         return results
     
     def process_scraped_data(self, tender_data_list: List[Dict], site_name: str) -> Dict:
         """Process scraped tender data and save to database"""
         stats = {'new': 0, 'updated': 0, 'errors': 0}
+        now = datetime.utcnow()
+        existing_tenders = self.load_existing_tenders(tender_data_list)
         
+        # The whole batch is normally written with a single commit
+        saved = []
         for tender_data in tender_data_list:
+            tender, outcome = self.stage_tender(tender_data, existing_tenders, now)
+            stats[outcome] += 1
+            if tender is not None:
+                saved.append((tender, tender_data.get('attachments')))
+        
+        try:
+            self.db.flush()  # Get the IDs of the new tenders
+            attachment_jobs = [(tender.id, attachments) for tender, attachments in saved if attachments]
+            self.db.commit()
+        except Exception as e:
+            # One bad row shouldn't cost the rest of the scrape
+            logger.warning(f"Batch save failed for {site_name}, retrying tenders one by one: {str(e)}")
+            self.db.rollback()
+            stats, attachment_jobs = self.save_tenders_individually(tender_data_list, site_name, now)
+        
+        # Tenders are committed before any download so no write lock is held over the network
+        if attachment_jobs:
+            self.process_attachments(attachment_jobs)
+        
+        return stats
+    
+    def load_existing_tenders(self, tender_data_list: List[Dict]) -> Dict[str, Tender]:
+        """Look up every tender in the batch that already exists with one query"""
+        urls = {tender_data['url'] for tender_data in tender_data_list}
+        if not urls:
+            return {}
+        return {tender.url: tender for tender in self.db.query(Tender).filter(Tender.url.in_(urls))}
+    
+    def stage_tender(self, tender_data: Dict, existing_tenders: Dict[str, Tender], now: datetime) -> Tuple[Optional[Tender], str]:
+        """Apply one scraped tender to the session; returns the row and whether it's new, updated or an error"""
+        existing_tender = existing_tenders.get(tender_data['url'])
+        
+        if existing_tender:
+            # Update existing tender
+            for key, value in tender_data.items():
+                if key != 'attachments' and hasattr(existing_tender, key):
+                    setattr(existing_tender, key, value)
+            existing_tender.last_updated = now
+            return existing_tender, 'updated'
+        
+        # Create new tender
+        tender_data_copy = tender_data.copy()
+        tender_data_copy.pop('attachments', None)
+        
+        # Validate required fields to prevent NULL constraint errors
+        if not tender_data_copy.get('title'):
+            logger.warning(f"Skipping tender with no title: {tender_data_copy.get('url')}")
+            return None, 'errors'
+        
+        # Ensure all required fields have default values
+        tender_data_copy.setdefault('description', '')
+        tender_data_copy.setdefault('budget_currency', 'USD')
+        tender_data_copy.setdefault('last_updated', now)
+        
+        tender = Tender(**tender_data_copy)
+        self.db.add(tender)
+        # A URL repeated later in the batch updates this row rather than adding another
+        existing_tenders[tender.url] = tender
+        return tender, 'new'
+    
+    def save_tenders_individually(self, tender_data_list: List[Dict], site_name: str, now: datetime) -> Tuple[Dict, List]:
+        """Save each tender with its own commit so a failing row only loses itself"""
+        stats = {'new': 0, 'updated': 0, 'errors': 0}
+        attachment_jobs = []
+        # The rollback discarded the batch's new rows, so look the batch up again
+        existing_tenders = self.load_existing_tenders(tender_data_list)
+        
+        for tender_data in tender_data_list:
+            known = tender_data['url'] in existing_tenders
             try:
-                # Check if tender already exists
-                existing_tender = self.db.query(Tender).filter_by(
-                    url=tender_data['url']
-                ).first()
-                
-                if existing_tender:
-                    # Update existing tender
-                    for key, value in tender_data.items():
-                        if key != 'attachments' and hasattr(existing_tender, key):
-                            setattr(existing_tender, key, value)
-                    existing_tender.last_updated = datetime.utcnow()
-                    tender = existing_tender
-                    stats['updated'] += 1
-                else:
-                    # Create new tender
-                    tender_data_copy = tender_data.copy()
-                    attachments = tender_data_copy.pop('attachments', [])
-                    
-                    # Validate required fields to prevent NULL constraint errors
-                    if not tender_data_copy.get('title'):
-                        logger.warning(f"Skipping tender with no title: {tender_data_copy.get('url')}")
-                        stats['errors'] += 1
-                        continue
-                    
-                    # Ensure all required fields have default values
-                    tender_data_copy.setdefault('description', '')
-                    tender_data_copy.setdefault('budget_currency', 'USD')
-                    tender_data_copy.setdefault('last_updated', datetime.utcnow())
-                    
-                    tender = Tender(**tender_data_copy)
-                    self.db.add(tender)
-                    self.db.flush()  # Get the ID
-                    stats['new'] += 1
-                
-                # Handle attachments
-                if 'attachments' in tender_data:
-                    self.process_attachments(tender_data['attachments'], tender.id)
-                
-                self.db.commit()
-                
+                tender, outcome = self.stage_tender(tender_data, existing_tenders, now)
+                if tender is not None:
+                    self.db.flush()
+                    if tender_data.get('attachments'):
+                        attachment_jobs.append((tender.id, tender_data['attachments']))
+                    self.db.commit()
+                stats[outcome] += 1
             except Exception as e:
-                logger.error(f"Error processing tender data: {str(e)}")
-                stats['errors'] += 1
+                logger.error(f"Error saving tender {tender_data.get('url')} from {site_name}: {str(e)}")
                 self.db.rollback()
+                if not known:
+                    existing_tenders.pop(tender_data['url'], None)
+                stats['errors'] += 1
         
-        return stats
+        return stats, attachment_jobs
     
-    def process_attachments(self, attachments: List[Dict], tender_id: int):
-        """Process and save tender attachments"""
-        scraper = TenderScraper({})  # Create instance for download method
+    def process_attachments(self, attachment_jobs: List[Tuple[int, List[Dict]]]):
+        """Download new attachments for saved tenders, then record them in one short write"""
+        try:
+            # Look up the batch's known documents once instead of once per attachment
+            tender_ids = [tender_id for tender_id, _ in attachment_jobs]
+            known = set(
+                self.db.query(TenderDocument.tender_id, TenderDocument.original_url)
+                .filter(TenderDocument.tender_id.in_(tender_ids))
+            )
+            # End the read so no transaction stays open across the downloads
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error processing attachments: {str(e)}")
+            self.db.rollback()
+            return
         
-        for attachment_data in attachments:
-            try:
-                # Check if document already exists
-                existing_doc = self.db.query(TenderDocument).filter_by(
+        new_attachments = []
+        for tender_id, attachments in attachment_jobs:
+            for attachment_data in attachments:
+                key = (tender_id, attachment_data['url'])
+                if key not in known:
+                    known.add(key)
+                    new_attachments.append((tender_id, attachment_data))
+        
+        if not new_attachments:
+            return
+        
+        # Download files concurrently; the session is only touched back on this thread
+        with ThreadPoolExecutor(max_workers=min(8, len(new_attachments))) as executor:
+            local_paths = list(executor.map(
+                lambda job: download_attachment(self.session, job[1], job[0]), new_attachments
+            ))
+        
+        try:
+            for (tender_id, attachment_data), local_path in zip(new_attachments, local_paths):
+                # Create document record
+                doc = TenderDocument(
                     tender_id=tender_id,
-                    original_url=attachment_data['url']
-                ).first()
+                    filename=attachment_data['filename'],
+                    original_url=attachment_data['url'],
+                    local_path=local_path,
+                    file_type=attachment_data.get('file_type', 'unknown')
+                )
                 
-                if not existing_doc:
-                    # Download file
-                    local_path = scraper.download_attachment(attachment_data, tender_id)
-                    
-                    # Create document record
-                    doc = TenderDocument(
-                        tender_id=tender_id,
-                        filename=attachment_data['filename'],
-                        original_url=attachment_data['url'],
-                        local_path=local_path,
-                        file_type=attachment_data.get('file_type', 'unknown')
-                    )
-                    
-                    if local_path and os.path.exists(local_path):
-                        doc.file_size = os.path.getsize(local_path)
-                    
-                    self.db.add(doc)
+                if local_path and os.path.exists(local_path):
+                    doc.file_size = os.path.getsize(local_path)
                 
-            except Exception as e:
-                logger.error(f"Error processing attachment: {str(e)}")
+                self.db.add(doc)
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error saving attachments: {str(e)}")
+            self.db.rollback()
     
     def close(self):
-        """Close database connection"""
+        """Close database connection and HTTP session"""
         self.db.close()
+        self.session.close()
 
 # Example usage
 if __name__ == "__main__":
@@ -4,9 +4,10 @@ Command-line interface for running scraping operations
 """
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from sqlalchemy import func
 from scraper2 import ScrapingManager
-from evaluator import TenderEvaluator
 from models import create_tables
 from config import Config
 
@@ -87,34 +88,56 @@ def scrape_specific_sites(manager, site_keys):
     
     from scraper import TenderScraper
     
+    # Scrapers are built up front on this thread; each one drives its own browser
+    scrapers = []
     for site_key in site_keys:
         if site_key not in Config.SITES_CONFIG:
             logger.error(f"Unknown site: {site_key}")
             continue
         
         site_config = Config.SITES_CONFIG[site_key]
-        logger.info(f"Scraping {site_config['name']}...")
-        
         try:
-            scraper = TenderScraper(site_config)
-            tender_data_list = scraper.scrape_site()
-            site_stats = manager.process_scraped_data(tender_data_list, site_config['name'])
-            
-            results['successful_sites'] += 1
-            results['total_tenders'] += len(tender_data_list)
-            results['new_tenders'] += site_stats['new']
-            results['updated_tenders'] += site_stats['updated']
-            results['site_results'][site_config['name']] = site_stats
-            
+            scrapers.append(TenderScraper(site_config))
         except Exception as e:
-            logger.error(f"Failed to scrape {site_config['name']}: {str(e)}")
+            logger.error(f"Failed to start scraper for {site_config['name']}: {str(e)}")
             results['failed_sites'] += 1
             results['site_results'][site_config['name']] = {'error': str(e)}
     
+    if not scrapers:
+        return results
+    
+    # Sites are separate hosts and scraping is network-bound, so run them side by side;
+    # results are saved here as they arrive, keeping the database session on one thread
+    with ThreadPoolExecutor(max_workers=min(Config.scraping.max_concurrent_sites, len(scrapers))) as executor:
+        futures = {}
+        for scraper in scrapers:
+            logger.info(f"Scraping {scraper.site_config['name']}...")
+            futures[executor.submit(scraper.scrape_site)] = scraper.site_config
+        
+        for future in as_completed(futures):
+            site_config = futures[future]
+            try:
+                tender_data_list = future.result()
+                site_stats = manager.process_scraped_data(tender_data_list, site_config['name'])
+                
+                results['successful_sites'] += 1
+                results['total_tenders'] += len(tender_data_list)
+                results['new_tenders'] += site_stats['new']
+                results['updated_tenders'] += site_stats['updated']
+                results['site_results'][site_config['name']] = site_stats
+                
+            except Exception as e:
+                logger.error(f"Failed to scrape {site_config['name']}: {str(e)}")
+                results['failed_sites'] += 1
+                results['site_results'][site_config['name']] = {'error': str(e)}
+    
     return results
 
 def run_evaluation():
     """Run tender evaluation"""
+    # Imported here so scraping-only runs don't load the AI analyzer stack
+    from evaluator import TenderEvaluator
+    
     try:
         evaluator = TenderEvaluator()
         results = evaluator.evaluate_all_tenders()
@@ -175,9 +198,14 @@ def show_status():
     # Database status
     try:
         db = SessionLocal()
-        tender_count = db.query(Tender).count()
-        document_count = db.query(TenderDocument).count()
-        log_count = db.query(ScrapingLog).count()
+        # All four counts in one round trip
+        today = datetime.now().replace(hour=0, minute=0, second=0)
+        tender_count, document_count, log_count, recent_tenders = db.query(
+            db.query(func.count(Tender.id)).scalar_subquery(),
+            db.query(func.count(TenderDocument.id)).scalar_subquery(),
+            db.query(func.count(ScrapingLog.id)).scalar_subquery(),
+            db.query(func.count(Tender.id)).filter(Tender.scraped_at >= today).scalar_subquery()
+        ).one()
         
         logger.info(f"Database: Connected")
         logger.info(f"Total tenders: {tender_count}")
@@ -185,9 +213,6 @@ def show_status():
         logger.info(f"Scraping logs: {log_count}")
         
         # Recent activity
-        recent_tenders = db.query(Tender).filter(
-            Tender.scraped_at >= datetime.now().replace(hour=0, minute=0, second=0)
-        ).count()
         logger.info(f"Tenders scraped today: {recent_tenders}")
         
         db.close()
@@ -3,25 +3,50 @@
 Simplified scraper for testing updated selectors
 """
 import requests
+from requests.adapters import HTTPAdapter
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+import re
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from config import Config
-from models import SessionLocal, Tender
+from models import SessionLocal, Tender, bulk_insert_chunks
+from scraper import RateLimiter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Link filters compiled once: a prefix match and a single substring scan per href
+INVALID_LINK_PREFIXES = ('javascript:', 'mailto:', '#', 'tel:')
+EXCLUDED_LINK_PATTERNS = (
+    '/careers', '/about', '/contact', '/press', '/subscribe',
+    '/board-of-directors', '/executive-leadership', '/expertise',
+    '/impact/', '/doing-business-with-abt$'
+)
+INVALID_LINK_RE = re.compile('|'.join(map(re.escape, INVALID_LINK_PREFIXES)))
+EXCLUDED_LINK_RE = re.compile('|'.join(map(re.escape, EXCLUDED_LINK_PATTERNS)))
+
+# Detail pages fetched at once per site; their requests are still spaced out by the site's rate limiter
+DETAIL_FETCH_WORKERS = 5
+
 class SimpleTenderScraper:
     def __init__(self):
         self.config = Config()
         self.db = SessionLocal()
         self.driver = None
+        self.rate_limiter = None
+        # One keep-alive session for every site's listing and detail fetches
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['User-Agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
         
     def setup_driver(self):
         """Setup Chrome WebDriver with appropriate options"""
@@ -36,59 +61,94 @@ class SimpleTenderScraper:
         self.driver = webdriver.Chrome(options=chrome_options)
         return self.driver
     
+    def get_driver(self):
+        """Start the browser on first use"""
+        if not self.driver:
+            self.setup_driver()
+        return self.driver
+    
     def extract_tender_links(self, site_config):
         """Extract tender links from search/listing page"""
         try:
             search_url = site_config['search_url']
-            self.driver.get(search_url)
-            time.sleep(3)
-            
-            # Extract links using CSS selectors
             link_selector = site_config['selectors']['tender_links']
-            link_elements = self.driver.find_elements(By.CSS_SELECTOR, link_selector)
+            hrefs = []
+            
+            # Server-rendered listings are read over HTTP; the browser is only started for
+            # JS sites or when the plain fetch finds no links
+            if not site_config.get('needs_js', False):
+                html = self.fetch_html(search_url)
+                if html:
+                    soup = BeautifulSoup(html, 'lxml')
+                    hrefs = [urljoin(search_url, link['href']) for link in soup.select(link_selector) if link.get('href')]
+            
+            if not hrefs:
+                driver = self.get_driver()
+                driver.get(search_url)
+                time.sleep(3)
+                
+                # Extract links using CSS selectors
+                link_elements = driver.find_elements(By.CSS_SELECTOR, link_selector)
+                hrefs = [element.get_attribute('href') for element in link_elements]
             
             links = []
-            invalid_prefixes = ['javascript:', 'mailto:', '#', 'tel:']
-            exclude_patterns = [
-                '/careers', '/about', '/contact', '/press', '/subscribe', 
-                '/board-of-directors', '/executive-leadership', '/expertise',
-                '/impact/', '/doing-business-with-abt$'
-            ]
-            
-            for element in link_elements:
-                href = element.get_attribute('href')
-                if href and not any(href.startswith(prefix) for prefix in invalid_prefixes):
-                    # Skip general navigation links
-                    if not any(pattern in href for pattern in exclude_patterns):
-                        # For specific sites, be more selective
-                        if site_config['name'] == 'Abt Global':
-                            if 'field_person_type' in href:
-                                links.append(href)
-                        elif site_config['name'] == 'Tetra Tech International Development':
-                            if any(ext in href for ext in ['.pdf', '.docx']) or 'tender' in href.lower():
-                                links.append(href)
-                        elif site_config['name'] == 'DT Global':
-                            if 'proposals/' in href and href != site_config['search_url']:
-                                links.append(href)
-                        else:
-                            links.append(href)
-            
-            # Remove duplicates
-            links = list(set(links))
-            logger.info(f"Found {len(links)} tender links on {site_config['name']}")
+            seen = set()
+            site_name = site_config['name']
+            
+            for href in hrefs:
+                # Skip invalid, already-seen and general navigation links
+                if not href or href in seen or INVALID_LINK_RE.match(href) or EXCLUDED_LINK_RE.search(href):
+                    continue
+                
+                # For specific sites, be more selective
+                if site_name == 'Abt Global':
+                    wanted = 'field_person_type' in href
+                elif site_name == 'Tetra Tech International Development':
+                    wanted = any(ext in href for ext in ['.pdf', '.docx']) or 'tender' in href.lower()
+                elif site_name == 'DT Global':
+                    wanted = 'proposals/' in href and href != site_config['search_url']
+                else:
+                    wanted = True
+                
+                if wanted:
+                    seen.add(href)
+                    links.append(href)
+            
+            logger.info(f"Found {len(links)} tender links on {site_name}")
             return links[:10]  # Limit for demo
             
         except Exception as e:
             logger.error(f"Error extracting tender links from {site_config['name']}: {str(e)}")
             return []
     
+    def fetch_html(self, url):
+        """Fetch a tender page over HTTP, or None if it isn't a plain HTML page"""
+        try:
+            self.rate_limiter.wait()
+            response = self.session.get(url, timeout=self.config.scraping.timeout)
+            response.raise_for_status()
+            if 'html' not in response.headers.get('Content-Type', ''):
+                return None
+            return response.text
+        except Exception as e:
+            logger.warning(f"HTTP fetch failed for {url}, falling back to browser: {str(e)}")
+            return None
+    
     def scrape_tender_details(self, url, site_config):
-        """Scrape details from individual tender page"""
+        """Scrape details from individual tender page in the browser"""
         try:
-            self.driver.get(url)
+            driver = self.get_driver()
+            driver.get(url)
             time.sleep(2)
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
+            return self.parse_tender_html(driver.page_source, url, site_config)
+        except Exception as e:
+            logger.error(f"Error scraping tender details from {url}: {str(e)}")
+            return None
+    
+    def parse_tender_html(self, html, url, site_config):
+        """Extract tender fields from a detail page's HTML"""
+        try:
+            soup = BeautifulSoup(html, 'lxml')
             
             # Extract title with fallbacks
             title = None
@@ -129,49 +189,58 @@ class SimpleTenderScraper:
                             description = text[:500] + "..." if len(text) > 500 else text
                             break
             
+            now = datetime.utcnow()
             tender_data = {
                 'title': title,
                 'url': url,
                 'source_site': site_config['name'],
                 'description': description or '',
                 'budget_currency': 'USD',
-                'scraped_at': datetime.utcnow(),
-                'last_updated': datetime.utcnow()
+                'scraped_at': now,
+                'last_updated': now
             }
             
             return tender_data
             
         except Exception as e:
-            logger.error(f"Error scraping tender details from {url}: {str(e)}")
+            logger.error(f"Error parsing tender details from {url}: {str(e)}")
             return None
     
-    def save_tender(self, tender_data):
-        """Save tender to database"""
+    def save_tenders(self, tender_data_list):
+        """Save new tenders to database in one transaction and return how many were saved"""
+        if not tender_data_list:
+            return 0
+        
         try:
-            # Check if tender already exists
-            existing = self.db.query(Tender).filter_by(url=tender_data['url']).first()
+            # Check which tenders already exist with a single query
+            urls = {tender_data['url'] for tender_data in tender_data_list}
+            existing = {url for (url,) in self.db.query(Tender.url).filter(Tender.url.in_(urls))}
             
-            if existing:
-                logger.info(f"Tender already exists: {tender_data['title']}")
-                return False
+            new_rows = []
+            for tender_data in tender_data_list:
+                if tender_data['url'] in existing:
+                    logger.info(f"Tender already exists: {tender_data['title']}")
+                    continue
+                existing.add(tender_data['url'])
+                new_rows.append(tender_data)
             
-            tender = Tender(**tender_data)
-            self.db.add(tender)
+            bulk_insert_chunks(self.db, Tender, new_rows)
             self.db.commit()
-            logger.info(f"Saved new tender: {tender_data['title']}")
-            return True
+            for tender_data in new_rows:
+                logger.info(f"Saved new tender: {tender_data['title']}")
+            return len(new_rows)
             
         except Exception as e:
-            logger.error(f"Error saving tender: {str(e)}")
+            logger.error(f"Error saving tenders: {str(e)}")
             self.db.rollback()
-            return False
+            return 0
     
     def scrape_site(self, site_key, site_config):
         """Scrape a single site"""
         logger.info(f"Scraping {site_config['name']}...")
         
-        if not self.driver:
-            self.setup_driver()
+        # Every HTTP request to this site, listing and detail pages alike, shares one pace
+        self.rate_limiter = RateLimiter(self.config.scraping.delay_between_requests)
         
         try:
             # Extract tender links
@@ -181,16 +250,23 @@ class SimpleTenderScraper:
                 logger.warning(f"No tender links found for {site_config['name']}")
                 return 0
             
-            saved_count = 0
-            for i, link in enumerate(tender_links):
+            # Detail pages are network bound, so fetch them side by side; the browser is only for pages HTTP can't serve
+            with ThreadPoolExecutor(max_workers=DETAIL_FETCH_WORKERS) as executor:
+                pages = list(executor.map(self.fetch_html, tender_links))
+            
+            scraped = []
+            for i, (link, html) in enumerate(zip(tender_links, pages)):
                 logger.info(f"Scraping tender {i+1}/{len(tender_links)}: {link}")
                 
-                tender_data = self.scrape_tender_details(link, site_config)
+                # Pages that couldn't be fetched as HTML (e.g. documents) go through the browser as before
+                if html:
+                    tender_data = self.parse_tender_html(html, link, site_config)
+                else:
+                    tender_data = self.scrape_tender_details(link, site_config)
                 if tender_data:
-                    if self.save_tender(tender_data):
-                        saved_count += 1
-                
-                time.sleep(1)  # Be polite
+                    scraped.append(tender_data)
+            
+            saved_count = self.save_tenders(scraped)
             
             logger.info(f"Successfully scraped {saved_count} new tenders from {site_config['name']}")
             return saved_count
@@ -207,9 +283,10 @@ class SimpleTenderScraper:
         total_scraped = 0
         
         try:
+            # The browser, if any site needs it, is started once and kept for the remaining sites
             for site_key in site_keys:
-                if site_key in self.config.SITES_CONFIG:
-                    site_config = self.config.SITES_CONFIG[site_key]
+                site_config = self.config.SITES_CONFIG.get(site_key)
+                if site_config:
                     count = self.scrape_site(site_key, site_config)
                     total_scraped += count
                 else:
@@ -219,6 +296,7 @@ class SimpleTenderScraper:
             if self.driver:
                 self.driver.quit()
             self.db.close()
+            self.session.close()
         
         logger.info(f"Scraping complete. Total new tenders: {total_scraped}")
         return total_scraped
@@ -12,15 +12,15 @@ import os
 import hashlib
 import re
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin, urlparse
+from sqlalchemy import func
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import nodriver as uc
 from nodriver import *
 from config import Config as konfig
 from models import Tender, TenderDocument, ScrapingLog, SessionLocal, create_tables
-from evaluator import TenderEvaluator
 
 # Set up logging
 logging.basicConfig(
@@ -33,6 +33,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Keyword scans compiled once; each page is searched in a single regex pass
+SECTOR_KEYWORDS = ['climate', 'environment', 'governance', 'infrastructure', 'health']
+COUNTRY_KEYWORDS = ['australia', 'fiji', 'vanuatu', 'solomon islands', 'papua new guinea']
+ATTACHMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.rtf']
+SECTOR_RE = re.compile('|'.join(map(re.escape, SECTOR_KEYWORDS)), re.IGNORECASE)
+COUNTRY_RE = re.compile('|'.join(map(re.escape, COUNTRY_KEYWORDS)), re.IGNORECASE)
+ATTACHMENT_RE = re.compile('|'.join(map(re.escape, ATTACHMENT_EXTENSIONS)), re.IGNORECASE)
+INVALID_LINK_PREFIXES = ['javascript:', 'mailto:', '#', 'tel:']
+EXCLUDED_LINK_PATTERNS = ['/careers', '/about', '/contact', '/press', '/subscribe']
+INVALID_LINK_RE = re.compile('|'.join(map(re.escape, INVALID_LINK_PREFIXES)))
+EXCLUDED_LINK_RE = re.compile('|'.join(map(re.escape, EXCLUDED_LINK_PATTERNS)))
+
 # BrowserSetup class
 class BrowserSetup:
     """Class to manage nodriver browser setup for web scraping"""
@@ -83,8 +95,12 @@ class BrowserSetup:
         try:
             browser = await uc.start(config=config)
             logger.info(f"Browser started with args: {browser.config.browser_args}")
-            await asyncio.sleep(1)
-            if not browser.connection or not browser.connection.is_connected:
+            # Only wait while the connection is still coming up, for at most a second
+            for _ in range(10):
+                if browser.connection and browser.connection.is_connected:
+                    break
+                await asyncio.sleep(0.1)
+            else:
                 raise RuntimeError("Browser connection not established")
             logger.info("Browser initialized successfully")
             return browser
@@ -194,17 +210,17 @@ class TenderScraperManager:
                     return []
 
             links = []
-            invalid_prefixes = ['javascript:', 'mailto:', '#', 'tel:']
-            exclude_patterns = ['/careers', '/about', '/contact', '/press', '/subscribe']
+            seen = set()
 
             for href in link_elements:
                 if isinstance(href, str):
                     full_url = urljoin(site_config['base_url'], href)
                 else:
                     full_url = urljoin(site_config['base_url'], await href.get_attribute('href'))
-                if (full_url and not any(full_url.startswith(prefix) for prefix in invalid_prefixes) and
-                    not any(pattern in full_url for pattern in exclude_patterns) and
-                    full_url not in links):
+                if (full_url and full_url not in seen and
+                    not INVALID_LINK_RE.match(full_url) and
+                    not EXCLUDED_LINK_RE.search(full_url)):
+                    seen.add(full_url)
                     links.append(full_url)
 
             logger.info(f"Found {len(links)} tender links on {site_config['name']}")
@@ -220,7 +236,7 @@ class TenderScraperManager:
             await page.sleep(2)
 
             html = await page.get_content()
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = BeautifulSoup(html, 'lxml')
 
             tender_data = {
                 'url': url,
@@ -355,13 +371,13 @@ class TenderScraperManager:
     def extract_additional_info(self, page_text: str) -> Dict:
         """Extract additional information from page text"""
         info = {}
-        sector_keywords = ['climate', 'environment', 'governance', 'infrastructure', 'health']
-        found_sectors = [keyword for keyword in sector_keywords if keyword in page_text.lower()]
+        matched = {match.lower() for match in SECTOR_RE.findall(page_text)}
+        found_sectors = [keyword for keyword in SECTOR_KEYWORDS if keyword in matched]
         if found_sectors:
             info['sector'] = ', '.join(found_sectors[:3])
 
-        countries = ['australia', 'fiji', 'vanuatu', 'solomon islands', 'papua new guinea']
-        found_locations = [country.title() for country in countries if country in page_text.lower()]
+        matched = {match.lower() for match in COUNTRY_RE.findall(page_text)}
+        found_locations = [country.title() for country in COUNTRY_KEYWORDS if country in matched]
         if found_locations:
             info['location'] = ', '.join(found_locations[:3])
         return info
@@ -369,12 +385,16 @@ class TenderScraperManager:
     def find_attachments(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
         """Find and catalog document attachments"""
         attachments = []
-        file_patterns = ['.pdf', '.doc', '.docx', '.rtf']
-        for link in soup.find_all('a', href=True):
+        for link in soup.select('a[href]'):
             href = link['href']
             link_text = link.get_text(strip=True)
-            for pattern in file_patterns:
-                if pattern in href.lower() or pattern in link_text.lower():
+            # Most links are not documents: reject them with one regex search each
+            if not (ATTACHMENT_RE.search(href) or ATTACHMENT_RE.search(link_text)):
+                continue
+            href_lower = href.lower()
+            text_lower = link_text.lower()
+            for pattern in ATTACHMENT_EXTENSIONS:
+                if pattern in href_lower or pattern in text_lower:
                     full_url = urljoin(base_url, href)
                     attachments.append({
                         'url': full_url,
@@ -385,6 +405,16 @@ class TenderScraperManager:
                     break
         return attachments
 
+    async def get_http_session(self) -> aiohttp.ClientSession:
+        """Shared HTTP client; its connection pool keeps sockets alive across downloads"""
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                headers={'User-Agent': self.ua.random},
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self.session
+
     async def download_attachment(self, attachment: Dict, tender_id: int) -> Optional[str]:
         """Download attachment file and return local path"""
         try:
@@ -392,14 +422,14 @@ class TenderScraperManager:
             filename = attachment['filename']
             hash_suffix = hashlib.md5(url.encode()).hexdigest()[:8]
             safe_filename = f"{tender_id}_{hash_suffix}_{filename}"
-            local_path = os.path.join(Config.ATTACHMENT_PATH, safe_filename)
+            local_path = os.path.join(konfig.ATTACHMENT_PATH, safe_filename)
 
-            async with self.session.get(url, timeout=30) as response:
+            session = await self.get_http_session()
+            async with session.get(url) as response:
                 response.raise_for_status()
-                content = await response.read()
-
-            async with aiofiles.open(local_path, 'wb') as f:
-                await f.write(content)
+                async with aiofiles.open(local_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        await f.write(chunk)
 
             logger.info(f"Downloaded attachment: {safe_filename}")
             return local_path
@@ -496,7 +526,7 @@ class TenderScraperManager:
 
             try:
                 tender_data_list = await self.scrape_site(site_config)
-                site_stats = self.process_scraped_data(tender_data_list, site_config['name'])
+                site_stats = await self.process_scraped_data(tender_data_list, site_config['name'])
 
                 log.end_time = datetime.utcnow()
                 log.status = 'success'
@@ -545,7 +575,7 @@ class TenderScraperManager:
 
             try:
                 tender_data_list = await self.scrape_site(site_config)
-                site_stats = self.process_scraped_data(tender_data_list, site_config['name'])
+                site_stats = await self.process_scraped_data(tender_data_list, site_config['name'])
 
                 log.end_time = datetime.utcnow()
                 log.status = 'success'
@@ -576,71 +606,111 @@ class TenderScraperManager:
         await asyncio.gather(*tasks, return_exceptions=True)
         return results
 
-    def process_scraped_data(self, tender_data_list: List[Dict], site_name: str) -> Dict:
+    async def process_scraped_data(self, tender_data_list: List[Dict], site_name: str) -> Dict:
         """Process scraped tender data and save to database"""
         stats = {'new': 0, 'updated': 0, 'errors': 0}
+        now = datetime.utcnow()
 
+        # The session is shared by every concurrently scraped site, so each write below runs
+        # and commits without yielding to the event loop; downloads happen between the writes
+        urls = {tender_data['url'] for tender_data in tender_data_list}
+        existing_tenders = {
+            tender.url: tender for tender in self.db.query(Tender).filter(Tender.url.in_(urls))
+        } if urls else {}
+
+        saved = []
         for tender_data in tender_data_list:
-            try:
-                existing_tender = self.db.query(Tender).filter_by(url=tender_data['url']).first()
-                if existing_tender:
-                    for key, value in tender_data.items():
-                        if key != 'attachments' and hasattr(existing_tender, key):
-                            setattr(existing_tender, key, value)
-                    existing_tender.last_updated = datetime.utcnow()
-                    tender = existing_tender
-                    stats['updated'] += 1
-                else:
-                    tender_data_copy = tender_data.copy()
-                    attachments = tender_data_copy.pop('attachments', [])
-                    if not tender_data_copy.get('title'):
-                        logger.warning(f"Skipping tender with no title: {tender_data_copy.get('url')}")
-                        stats['errors'] += 1
-                        continue
-
-                    tender_data_copy.setdefault('description', '')
-                    tender_data_copy.setdefault('budget_currency', 'USD')
-                    tender_data_copy.setdefault('last_updated', datetime.utcnow())
-                    tender = Tender(**tender_data_copy)
-                    self.db.add(tender)
-                    self.db.flush()
-                    stats['new'] += 1
-
-                if 'attachments' in tender_data:
-                    self.process_attachments(tender_data['attachments'], tender.id)
-                self.db.commit()
-            except Exception as e:
-                logger.error(f"Error processing tender data: {str(e)}")
-                stats['errors'] += 1
-                self.db.rollback()
+            existing_tender = existing_tenders.get(tender_data['url'])
+            if existing_tender:
+                for key, value in tender_data.items():
+                    if key != 'attachments' and hasattr(existing_tender, key):
+                        setattr(existing_tender, key, value)
+                existing_tender.last_updated = now
+                tender = existing_tender
+                stats['updated'] += 1
+            else:
+                tender_data_copy = tender_data.copy()
+                tender_data_copy.pop('attachments', None)
+                if not tender_data_copy.get('title'):
+                    logger.warning(f"Skipping tender with no title: {tender_data_copy.get('url')}")
+                    stats['errors'] += 1
+                    continue
+
+                tender_data_copy.setdefault('description', '')
+                tender_data_copy.setdefault('budget_currency', 'USD')
+                tender_data_copy.setdefault('last_updated', now)
+                tender = Tender(**tender_data_copy)
+                self.db.add(tender)
+                existing_tenders[tender.url] = tender
+                stats['new'] += 1
+            saved.append((tender, tender_data.get('attachments')))
 
+        try:
+            # Tenders are committed first: attachment file names and documents need their ids
+            self.db.flush()
+            attachment_jobs = [(tender.id, attachments) for tender, attachments in saved if attachments]
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error saving tenders from {site_name}: {str(e)}")
+            self.db.rollback()
+            stats['errors'] += stats['new'] + stats['updated']
+            stats['new'] = stats['updated'] = 0
+            return stats
+
+        if attachment_jobs:
+            await self.process_attachments(attachment_jobs)
         return stats
 
-    def process_attachments(self, attachments: List[Dict], tender_id: int):
-        """Process and save tender attachments"""
-        for attachment_data in attachments:
-            try:
-                existing_doc = self.db.query(TenderDocument).filter_by(
+    async def process_attachments(self, attachment_jobs: List[Tuple[int, List[Dict]]]):
+        """Download new attachments for saved tenders, then record them in one write"""
+        tender_ids = [tender_id for tender_id, _ in attachment_jobs]
+        known = set(
+            self.db.query(TenderDocument.tender_id, TenderDocument.original_url)
+            .filter(TenderDocument.tender_id.in_(tender_ids))
+            .all()
+        )
+        # End the read so no transaction stays open across the downloads
+        self.db.commit()
+
+        new_attachments = []
+        for tender_id, attachments in attachment_jobs:
+            for attachment_data in attachments:
+                key = (tender_id, attachment_data['url'])
+                if key not in known:
+                    known.add(key)
+                    new_attachments.append((tender_id, attachment_data))
+
+        if not new_attachments:
+            return
+
+        # Download concurrently over the pooled session, outside any transaction
+        local_paths = await asyncio.gather(
+            *(self.download_attachment(attachment_data, tender_id) for tender_id, attachment_data in new_attachments)
+        )
+
+        # No awaits from here on: the documents are added and committed in one go
+        try:
+            for (tender_id, attachment_data), local_path in zip(new_attachments, local_paths):
+                doc = TenderDocument(
                     tender_id=tender_id,
-                    original_url=attachment_data['url']
-                ).first()
-                if not existing_doc:
-                    local_path = asyncio.run(self.download_attachment(attachment_data, tender_id))
-                    doc = TenderDocument(
-                        tender_id=tender_id,
-                        filename=attachment_data['filename'],
-                        original_url=attachment_data['url'],
-                        local_path=local_path,
-                        file_type=attachment_data.get('file_type', 'unknown')
-                    )
-                    if local_path and os.path.exists(local_path):
-                        doc.file_size = os.path.getsize(local_path)
-                    self.db.add(doc)
-            except Exception as e:
-                logger.error(f"Error processing attachment: {str(e)}")
+                    filename=attachment_data['filename'],
+                    original_url=attachment_data['url'],
+                    local_path=local_path,
+                    file_type=attachment_data.get('file_type', 'unknown')
+                )
+                if local_path and os.path.exists(local_path):
+                    doc.file_size = os.path.getsize(local_path)
+                self.db.add(doc)
+            self.db.commit()
+        except Exception as e:
+            logger.error(f"Error saving attachments: {str(e)}")
+            self.db.rollback()
 
     def run_evaluation(self):
         """Run tender evaluation"""
+        # Imported here so scraping-only runs don't load the AI analyzer stack
+        from evaluator import TenderEvaluator
+
         try:
             evaluator = TenderEvaluator()
             results = evaluator.evaluate_all_tenders()
@@ -689,26 +759,27 @@ class TenderScraperManager:
         logger.info("SYSTEM STATUS")
         logger.info("=" * 50)
         try:
-            tender_count = self.db.query(Tender).count()
-            document_count = self.db.query(TenderDocument).count()
-            log_count = self.db.query(ScrapingLog).count()
+            # All four counts in one round trip
+            today = datetime.now().replace(hour=0, minute=0, second=0)
+            tender_count, document_count, log_count, recent_tenders = self.db.query(
+                self.db.query(func.count(Tender.id)).scalar_subquery(),
+                self.db.query(func.count(TenderDocument.id)).scalar_subquery(),
+                self.db.query(func.count(ScrapingLog.id)).scalar_subquery(),
+                self.db.query(func.count(Tender.id)).filter(Tender.scraped_at >= today).scalar_subquery()
+            ).one()
             logger.info(f"Database: Connected")
             logger.info(f"Total tenders: {tender_count}")
             logger.info(f"Total documents: {document_count}")
             logger.info(f"Scraping logs: {log_count}")
-
-            recent_tenders = self.db.query(Tender).filter(
-                Tender.scraped_at >= datetime.now().replace(hour=0, minute=0, second=0)
-            ).count()
             logger.info(f"Tenders scraped today: {recent_tenders}")
         except Exception as e:
             logger.error(f"Database error: {str(e)}")
 
         logger.info("")
         logger.info("Configuration:")
-        logger.info(f"OpenAI API: {'Configured' if Config.OPENAI_API_KEY else 'Missing'}")
-        logger.info(f"Devex credentials: {'Configured' if Config.DEVEX_EMAIL else 'Missing'}")
-        logger.info(f"Tenders.gov.au credentials: {'Configured' if Config.TENDERS_GOV_EMAIL else 'Missing'}")
+        logger.info(f"OpenAI API: {'Configured' if konfig.OPENAI_API_KEY else 'Missing'}")
+        logger.info(f"Devex credentials: {'Configured' if konfig.DEVEX_EMAIL else 'Missing'}")
+        logger.info(f"Tenders.gov.au credentials: {'Configured' if konfig.TENDERS_GOV_EMAIL else 'Missing'}")
 
         logger.info("")
         logger.info("Configured sites:")